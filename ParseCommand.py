@@ -17,6 +17,9 @@ class ShellCommand:
         self.flags: list[str] = []
         # parameters of command
         self.params: list[str] = []
+        # flags and parameters in the order given, for commands whose
+        # arguments depend on position, e.g, `find -mtime -7'
+        self.args: list[str] = []
 
         # Input file if file input
         self.infile: str = ""
@@ -46,6 +49,7 @@ class ShellCommand:
         yield "name", self.name
         yield "flags", self.flags
         yield "params", self.params
+        yield "args", self.args
         yield "fileIn", self.fileIn
         yield "fileOut", self.fileOut
         yield "fileAppend", self.fileAppend
@@ -107,6 +111,7 @@ def parseCommand(commandStr: str) -> list[ShellCommand]:
             # Is flag
             if commandParts[i].startswith("-"):
                 shellCommand.flags.append(commandParts[i])
+                shellCommand.args.append(commandParts[i])
             # Infile redirect
             elif commandParts[i] == "<":
                 shellCommand.fileIn = True
@@ -133,6 +138,7 @@ def parseCommand(commandStr: str) -> list[ShellCommand]:
                     shellCommand.outfile = commandParts[i]
             else:
                 shellCommand.params.append(commandParts[i])
+                shellCommand.args.append(commandParts[i])
             # increment counter
             i += 1
 
@@ -0,0 +1,125 @@
+from collections.abc import Iterator
+import cmd_pkg
+from cmd_pkg import fileSystem
+from cmd_pkg.InputLines import fileLines
+from ParseCommand import ShellCommand
+
+
+def outputLines(result: str | Iterator[str] | None) -> Iterator[str]:
+    """
+    Turns the result of a command, either a string or an iterator of
+    strings, into an iterator over its lines.
+    """
+    if result is None:
+        return
+    if isinstance(result, str):
+        yield from result.splitlines()
+        return
+
+    for text in result:
+        # Keeps the empty lines commands yield on purpose
+        yield from text.splitlines() or [""]
+
+
+def redirectOutput(shellCmd: ShellCommand, output: Iterator[str]) -> Iterator[str]:
+    """
+    Writes the output lines of a command to its outfile as they are
+    produced, truncating the file for ">" and appending to it for ">>".
+    Writes go through a file handle, so memory use stays bounded however
+    long the output is, and appending leaves the existing content as it
+    is. Returns an iterator over error messages, if any.
+    """
+    mode: str = "a" if shellCmd.fileAppend else "w"
+
+    try:
+        with fileSystem.open_file(shellCmd.outfile, mode) as file:
+            for line in output:
+                file.write(line + "\n")
+    except FileNotFoundError:
+        return iter([f"{shellCmd.outfile}: No such file or directory"])
+    except NotADirectoryError:
+        return iter([f"{shellCmd.outfile}: Not a directory"])
+    except IsADirectoryError:
+        return iter([f"{shellCmd.outfile}: Is a directory"])
+
+    return iter([])
+
+
+def runCommand(
+    shellCmd: ShellCommand, lines: Iterator[str] | None, color: bool = True
+) -> Iterator[str]:
+    """
+    Runs a single command with the output lines of the previous command,
+    or of its infile, as its input, and returns an iterator over its
+    output lines, or writes them to its outfile. Commands
+    returning a string have run when this returns. Commands returning an
+    iterator, such as cat and grep, only do their work as their output is
+    consumed.
+    """
+    if not cmd_pkg.is_command(shellCmd.name):
+        return iter([f"{shellCmd.name}: command not found"])
+
+    if (shellCmd.fileIn and not shellCmd.infile) or (
+        (shellCmd.fileOut or shellCmd.fileAppend) and not shellCmd.outfile
+    ):
+        return iter(["syntax error near unexpected token `newline'"])
+
+    # Input redirected with "<" replaces the piped input, read in blocks
+    if shellCmd.fileIn:
+        if not fileSystem.path_exists(shellCmd.infile):
+            return iter([f"{shellCmd.infile}: No such file or directory"])
+        if fileSystem.is_dir(shellCmd.infile):
+            return iter([f"{shellCmd.infile}: Is a directory"])
+
+        lines = fileLines(shellCmd.infile)
+
+    commandFunc = getattr(cmd_pkg, shellCmd.name)
+    result = commandFunc(
+        flags=shellCmd.flags,
+        params=shellCmd.params,
+        args=shellCmd.args,
+        stdin=shellCmd.stdin,
+        stdout=shellCmd.stdout,
+        lines=lines,
+        color=color,
+    )
+
+    # Output redirected with ">" or ">>" is written out right away, as a
+    # shell would, even if no later command reads it
+    if shellCmd.fileOut or shellCmd.fileAppend:
+        return redirectOutput(shellCmd, outputLines(result))
+
+    return outputLines(result)
+
+
+def runPipeline(commandList: list[ShellCommand], color: bool = True) -> Iterator[str]:
+    """
+    Runs the commands of a pipeline, each reading the output of the one
+    before it, and yields the output lines of the last one. The stages are
+    chained generators, so lines flow through one at a time, and a stage
+    that stops early, like `head', stops the stages before it from reading
+    any further. Commands print without ANSI colors if color is False.
+    """
+    lines: Iterator[str] | None = None
+    stages: list[Iterator[str]] = []
+
+    try:
+        for shellCmd in commandList:
+            lines = runCommand(shellCmd, lines, color)
+            stages.append(lines)
+
+        if lines is not None:
+            yield from lines
+    finally:
+        # Closes unfinished stages now rather than when garbage collected,
+        # which also closes the files they were reading
+        for stage in reversed(stages):
+            if hasattr(stage, "close"):
+                stage.close()
+
+
+if __name__ == "__main__":
+    from ParseCommand import parseCommand
+
+    for line in runPipeline(parseCommand("ls -l / | grep root | sort -r")):
+        print(line)
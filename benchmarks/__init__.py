@@ -0,0 +1,4 @@
+"""
+Scripts exercising the virtual file system under load. Run them from the
+root of the repository, e.g. `python -m benchmarks.stress'.
+"""
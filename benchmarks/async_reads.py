@@ -0,0 +1,94 @@
+"""
+Measures read throughput of asyncFileSystem as the worker pool grows.
+
+Builds a temporary tree of directories holding files, then for each pool
+size runs many concurrent tasks, each listing a directory and reading a
+file, and reports operations per second. sqlite releases the GIL while
+it runs a query, so throughput grows with the number of workers until
+the Python side of each call becomes the limit.
+
+    python -m benchmarks.async_reads --dirs 50 --files 20 --tasks 2000
+"""
+import argparse, asyncio, os, random, sys, tempfile, time
+
+from cmd_pkg import fileSystem, asyncFileSystem
+
+CSV_FILE: str = "fileData.csv"
+
+
+def build_tree(dirs: int, files: int, size: int) -> list[str]:
+    """
+    Creates dirs directories of files files of size bytes each under
+    /bench, in a single transaction. Returns the paths of the directories.
+    """
+    rng: random.Random = random.Random(0)
+    paths: list[str] = []
+
+    with fileSystem.transaction():
+        fileSystem.make_dir("/bench")
+
+        for i in range(dirs):
+            path: str = f"/bench/d{i}"
+            fileSystem.make_dir(path)
+            paths.append(path)
+
+            for j in range(files):
+                fileSystem.write_file(f"{path}/f{j}", rng.randbytes(size))
+
+    return paths
+
+
+async def read_load(dirs: list[str], files: int, tasks: int, seed: int) -> float:
+    """
+    Runs tasks concurrent reads, each listing a directory and reading one
+    of its files. Returns the operations per second.
+    """
+    rng: random.Random = random.Random(seed)
+
+    async def one() -> None:
+        path: str = rng.choice(dirs)
+        await asyncFileSystem.list_dir(path)
+        await asyncFileSystem.read_file(f"{path}/f{rng.randrange(files)}")
+
+    start: float = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(tasks)))
+
+    return tasks * 2 / (time.perf_counter() - start)
+
+
+def main() -> int:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="Measure concurrent read throughput of asyncFileSystem."
+    )
+    parser.add_argument("--dirs", type=int, default=50)
+    parser.add_argument("--files", type=int, default=20, help="files per directory")
+    parser.add_argument("--size", type=int, default=256 * 1024, help="bytes per file")
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        fileSystem.enable_concurrency()
+        fileSystem.set_db_path(os.path.join(directory, "bench.sqlite"))
+        fileSystem.csv_to_table(CSV_FILE)
+        dirs: list[str] = build_tree(args.dirs, args.files, args.size)
+        baseline: float | None = None
+
+        print(f"{'workers':>8} {'ops/s':>10} {'speedup':>8}")
+
+        for workers in args.workers:
+            asyncFileSystem.set_max_workers(workers)
+            # Warm up the pool so connections are opened before timing
+            asyncio.run(read_load(dirs, args.files, workers * 4, seed=-1))
+            rate: float = asyncio.run(read_load(dirs, args.files, args.tasks, seed=0))
+            baseline = baseline or rate
+            print(f"{workers:>8} {rate:>10.0f} {rate / baseline:>7.2f}x")
+
+        asyncFileSystem.shutdown()
+        fileSystem.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+Checks that starting the shell stays within an import-time budget.
+
+Runs `python -X importtime -c "import main"' several times, with bytecode
+cached in a temporary directory as it would be after the first launch,
+and takes the fastest run, which is the least disturbed by other load.
+Prints the modules that took longest to import and exits with status 1
+if importing main, and so everything the shell imports before its first
+prompt, took longer than the budget.
+
+    python -m benchmarks.import_budget --budget-ms 50
+"""
+import argparse, os, subprocess, sys, tempfile
+
+ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(env: dict[str, str]) -> dict[str, tuple[int, int]]:
+    """
+    Imports main in a new interpreter and returns module name -> (self,
+    cumulative) import time in microseconds, as reported by -X importtime.
+    """
+    process: subprocess.CompletedProcess = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: dict[str, tuple[int, int]] = {}
+
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        own, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = (int(own), int(cumulative))
+
+    return times
+
+
+def fastest_import_times(runs: int = 5) -> dict[str, tuple[int, int]]:
+    """
+    Returns the import_times() of the run that imported main fastest, out
+    of runs, with bytecode already cached.
+    """
+    with tempfile.TemporaryDirectory() as cache:
+        env: dict[str, str] = dict(os.environ, PYTHONPYCACHEPREFIX=cache)
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+
+        import_times(env)  # Writes the bytecode cache
+        timed: list[dict[str, tuple[int, int]]] = [
+            import_times(env) for _ in range(runs)
+        ]
+
+    return min(timed, key=lambda times: times["main"][1])
+
+
+def main() -> int:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="Fail if the shell's imports exceed a time budget."
+    )
+    parser.add_argument("--budget-ms", type=float, default=50.0)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="slowest modules shown")
+    args = parser.parse_args()
+
+    fastest: dict[str, tuple[int, int]] = fastest_import_times(args.runs)
+    total_ms: float = fastest["main"][1] / 1000
+
+    print(f"slowest modules by own import time, of {len(fastest)}:")
+    for name, (own, cumulative) in sorted(
+        fastest.items(), key=lambda item: item[1][0], reverse=True
+    )[: args.top]:
+        print(f"    {own / 1000:8.2f}ms {cumulative / 1000:8.2f}ms  {name}")
+
+    within: bool = total_ms <= args.budget_ms
+    print(
+        f"import main: {total_ms:.2f}ms, budget {args.budget_ms:.2f}ms, "
+        f"{'OK' if within else 'OVER BUDGET'}"
+    )
+
+    return 0 if within else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+"""
+Multi-process stress test of the file system in concurrency mode.
+
+Starts several writer processes, each changing its own directory with a
+random mix of operations, and reader processes walking the whole tree
+while the writers run, all against the same database file. Afterwards
+every writer checks its directory against what it expects, and the
+database is checked for orphaned entries, wrong refcounts and leftover
+content. Exits with status 1 if anything is inconsistent or any
+operation failed.
+
+    python -m benchmarks.stress --writers 4 --readers 2 --ops 300
+"""
+import argparse, contextlib, io, multiprocessing, os, random, sqlite3, sys, time
+import tempfile
+
+from cmd_pkg import fileSystem
+
+CSV_FILE: str = "fileData.csv"
+TABLE_NAME: str = "FileSystem"
+
+# Content shared by all writers, so chunks are deduplicated across processes
+SHARED: list[bytes] = [b"shared content %d\n" % i * 50 for i in range(4)]
+
+
+def _random_content(rng: random.Random) -> bytes:
+    """
+    Returns either shared content or a few random bytes.
+    """
+    if rng.random() < 0.5:
+        return rng.choice(SHARED)
+
+    return rng.randbytes(rng.randint(0, 2000))
+
+
+def writer(index: int, db_path: str, ops: int, seed: int) -> dict:
+    """
+    Runs ops random operations in /w<index> and returns the number of
+    operations done, the errors printed by fileSystem and the differences
+    between the final tree and the expected one.
+    """
+    rng: random.Random = random.Random(seed + index)
+    fileSystem.enable_concurrency()
+    fileSystem.set_db_path(db_path)
+    fileSystem.set_table_name(TABLE_NAME)
+
+    root: str = f"/w{index}"
+    dirs: list[str] = [root]
+    files: dict[str, bytes] = {}
+    output: io.StringIO = io.StringIO()
+    start: float = time.perf_counter()
+
+    def new_name() -> str:
+        return f"{rng.choice(dirs)}/n{rng.randrange(10**9)}"
+
+    def step() -> None:
+        choice: float = rng.random()
+
+        if choice < 0.15 or not files:
+            path: str = new_name()
+            fileSystem.make_dir(path)
+            dirs.append(path)
+        elif choice < 0.4:
+            path = new_name()
+            files[path] = _random_content(rng)
+            fileSystem.write_file(path, files[path])
+        elif choice < 0.5:
+            path = rng.choice(list(files))
+            extra: bytes = _random_content(rng)
+
+            with fileSystem.open_file(path, "a") as file:
+                file.write(extra)
+            files[path] += extra
+        elif choice < 0.6:
+            src: str = rng.choice(list(files))
+            dest: str = new_name()
+            fileSystem.copy_file(src, dest)
+            files[dest] = files[src]
+        elif choice < 0.7:
+            src = rng.choice(list(files))
+            dest = new_name()
+            fileSystem.move(src, dest)
+            files[dest] = files.pop(src)
+        elif choice < 0.8:
+            path = rng.choice(list(files))
+            fileSystem.remove(path)
+            del files[path]
+        elif choice < 0.85 and len(dirs) > 1:
+            path = rng.choice(dirs[1:])
+            fileSystem.remove_tree(path)
+            dirs[:] = [d for d in dirs if d != path and not d.startswith(path + "/")]
+            for name in [f for f in files if f.startswith(path + "/")]:
+                del files[name]
+        else:
+            # Reads of other writers' directories, which may be changing
+            fileSystem.stats_many([new_name(), root, *list(files)[:20]])
+            fileSystem.exists_many([f"/w{i}" for i in range(8)])
+
+    with contextlib.redirect_stdout(output):
+        fileSystem.make_dir(root)
+
+        for _ in range(ops):
+            # Every few operations are grouped into one transaction
+            if rng.random() < 0.1:
+                with fileSystem.transaction():
+                    for _ in range(rng.randint(2, 5)):
+                        step()
+            else:
+                step()
+
+        seconds: float = time.perf_counter() - start
+        problems: list[str] = []
+        found: set[str] = set()
+
+        for dirpath, dirnames, filenames in fileSystem.walk(root):
+            found.add(dirpath)
+            found.update(f"{dirpath}/{name}" for name in filenames)
+
+        expected: set[str] = set(dirs) | set(files)
+
+        for path in sorted(expected - found):
+            problems.append(f"missing {path}")
+        for path in sorted(found - expected):
+            problems.append(f"unexpected {path}")
+
+        for path, content in files.items():
+            if path not in found:
+                continue
+            if fileSystem.read_file(path) != content:
+                problems.append(f"wrong content in {path}")
+            if fileSystem.stats(path).file_size != len(content):
+                problems.append(f"wrong file_size of {path}")
+
+    fileSystem.close()
+    errors: list[str] = [
+        line for line in output.getvalue().splitlines() if line.startswith("Error")
+    ]
+
+    return {"ops": ops, "seconds": seconds, "errors": errors, "problems": problems}
+
+
+def reader(db_path: str, done) -> dict:
+    """
+    Walks the whole tree until done is set. Returns the number of walks
+    and the errors printed by fileSystem.
+    """
+    fileSystem.enable_concurrency()
+    fileSystem.set_db_path(db_path)
+    fileSystem.set_table_name(TABLE_NAME)
+    output: io.StringIO = io.StringIO()
+    walks: int = 0
+
+    with contextlib.redirect_stdout(output):
+        while not done.is_set():
+            for dirpath, dirnames, filenames in fileSystem.walk("/"):
+                pass
+            walks += 1
+
+    fileSystem.close()
+    errors: list[str] = [
+        line for line in output.getvalue().splitlines() if line.startswith("Error")
+    ]
+
+    return {"walks": walks, "errors": errors}
+
+
+def check_database(db_path: str) -> list[str]:
+    """
+    Checks the tables of the file system for inconsistencies and returns
+    a description of each one found.
+    """
+    conn: sqlite3.Connection = sqlite3.connect(db_path)
+    t: str = TABLE_NAME
+    problems: list[str] = []
+    checks: dict[str, str] = {
+        "orphaned entries": f"""
+            SELECT count(*) FROM "{t}"
+            WHERE pid != 0 AND pid NOT IN (SELECT id FROM "{t}")
+        """,
+        "entries unreachable from /": f"""
+            WITH RECURSIVE tree(id) AS (
+                SELECT 0
+                UNION ALL
+                SELECT t.id FROM "{t}" AS t JOIN tree ON t.pid = tree.id
+            )
+            SELECT (SELECT count(*) FROM "{t}") - (SELECT count(*) - 1 FROM tree)
+        """,
+        "chunks of deleted files": f"""
+            SELECT count(*) FROM "{t}_data"
+            WHERE file_id NOT IN (SELECT id FROM "{t}")
+        """,
+        "chunks without content": f"""
+            SELECT count(*) FROM "{t}_data"
+            WHERE hash NOT IN (SELECT hash FROM "{t}_content")
+        """,
+        "wrong refcounts": f"""
+            SELECT count(*) FROM "{t}_content" AS c
+            WHERE refcount != (SELECT count(*) FROM "{t}_data" WHERE hash = c.hash)
+        """,
+        "unreferenced content": f"""
+            SELECT count(*) FROM "{t}_content" WHERE refcount <= 0
+        """,
+    }
+
+    for name, query in checks.items():
+        count: int = conn.execute(query).fetchone()[0]
+
+        if count:
+            problems.append(f"{count} {name}")
+
+    integrity: str = conn.execute("PRAGMA integrity_check").fetchone()[0]
+
+    if integrity != "ok":
+        problems.append(f"integrity_check: {integrity}")
+
+    conn.close()
+
+    return problems
+
+
+def main() -> int:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="Stress test the file system from several processes."
+    )
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=2)
+    parser.add_argument("--ops", type=int, default=300, help="operations per writer")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db", help="database file, a temporary one by default")
+    args = parser.parse_args()
+
+    directory: tempfile.TemporaryDirectory = tempfile.TemporaryDirectory()
+    db_path: str = args.db or os.path.join(directory.name, "stress.sqlite")
+
+    fileSystem.enable_concurrency()
+    fileSystem.set_db_path(db_path)
+    fileSystem.set_table_name(TABLE_NAME)
+    fileSystem.csv_to_table(CSV_FILE)
+    fileSystem.close()
+
+    # Fresh interpreters, so no process inherits another's connections
+    context = multiprocessing.get_context("spawn")
+    done = context.Manager().Event()
+
+    with context.Pool(args.writers + args.readers) as pool:
+        readers = [
+            pool.apply_async(reader, (db_path, done)) for _ in range(args.readers)
+        ]
+        writers = [
+            pool.apply_async(writer, (i, db_path, args.ops, args.seed))
+            for i in range(args.writers)
+        ]
+        writer_results: list[dict] = [result.get() for result in writers]
+        done.set()
+        reader_results: list[dict] = [result.get() for result in readers]
+
+    failed: bool = False
+
+    for i, result in enumerate(writer_results):
+        print(
+            f"writer {i}: {result['ops']} ops in {result['seconds']:.2f}s, "
+            f"{len(result['errors'])} errors, {len(result['problems'])} problems"
+        )
+        for line in result["errors"] + result["problems"]:
+            print(f"    {line}")
+        failed = failed or bool(result["errors"] or result["problems"])
+
+    for i, result in enumerate(reader_results):
+        print(f"reader {i}: {result['walks']} walks, {len(result['errors'])} errors")
+        for line in result["errors"]:
+            print(f"    {line}")
+        failed = failed or bool(result["errors"])
+
+    problems: list[str] = check_database(db_path)
+
+    for problem in problems:
+        print(f"database: {problem}")
+
+    print("FAILED" if failed or problems else "OK")
+    directory.cleanup()
+
+    return 1 if failed or problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,361 @@
+"""
+Timed scenarios for the fileSystem operations on a synthetic tree.
+
+Generates a tree with benchmarks.tree, loads it with csv_to_table() into
+a temporary database and times each scenario over the same, seeded
+choice of paths. Reading scenarios are run --repeat times and the
+fastest run is kept. Scenarios that change the tree run once, in the
+order listed in SCENARIOS, with remove_tree last.
+
+Results are written as JSON, to stdout or --output, with a summary table
+on stderr. Given --compare with a saved result, each scenario's mean time
+per operation is checked against it, and the exit status is 1 if any is
+slower by more than --threshold.
+
+    python -m benchmarks.suite --depth 3 --fanout 10 --files 20 --output base.json
+    python -m benchmarks.suite --depth 3 --fanout 10 --files 20 --compare base.json
+"""
+import argparse, json, os, platform, random, sqlite3, sys, tempfile, time
+from collections.abc import Callable, Iterator
+
+from cmd_pkg import fileSystem
+from benchmarks.tree import TreeInfo, write_tree
+
+TABLE_NAME: str = "FileSystem"
+
+
+class Context:
+    """
+    What scenarios share: the generated tree, its CSV file, the number of
+    operations to run and a random generator to choose paths with.
+    """
+
+    def __init__(self, info: TreeInfo, csv_file: str, ops: int, seed: int) -> None:
+        self.info: TreeInfo = info
+        self.csv_file: str = csv_file
+        self.ops: int = ops
+        self.seed: int = seed
+
+    def choices(self, paths: list[str]) -> list[str]:
+        """
+        Returns ops paths chosen from paths, the same ones on every call.
+        """
+        rng: random.Random = random.Random(self.seed)
+
+        return [rng.choice(paths) for _ in range(self.ops)]
+
+
+def _timed(func: Callable, args: list[tuple]) -> list[float]:
+    """
+    Calls func with each tuple of args and returns the seconds each took.
+    """
+    times: list[float] = []
+
+    for arg in args:
+        start: float = time.perf_counter()
+        func(*arg)
+        times.append(time.perf_counter() - start)
+
+    return times
+
+
+def _cold(func: Callable) -> Callable:
+    """
+    Returns func made to run with an empty dentry cache. Clearing the
+    cache is part of the time, but is negligible next to a lookup.
+    """
+
+    def cold(*args):
+        fileSystem.clear_dentry_cache()
+        return func(*args)
+
+    return cold
+
+
+def _ls_long(path: str) -> None:
+    """
+    Runs `ls -l path' as the shell does, without color, and consumes the
+    output.
+    """
+    import cmd_pkg
+
+    result: str | Iterator[str] = cmd_pkg.ls(
+        flags=["-l"], params=[path], stdout=False, color=False
+    )
+
+    if not isinstance(result, str):
+        for _ in result:
+            pass
+
+
+def scenario_csv_to_table(ctx: Context) -> list[float]:
+    fileSystem.drop_table(TABLE_NAME)
+    start: float = time.perf_counter()
+    fileSystem.csv_to_table(ctx.csv_file, TABLE_NAME)
+
+    return [time.perf_counter() - start]
+
+
+def scenario_path_exists_cold(ctx: Context) -> list[float]:
+    paths: list[str] = ctx.choices(ctx.info.files)
+    return _timed(_cold(fileSystem.path_exists), [(path,) for path in paths])
+
+
+def scenario_path_exists_warm(ctx: Context) -> list[float]:
+    paths: list[str] = ctx.choices(ctx.info.files)
+    fileSystem.set_dentry_cache_size(max(len(ctx.info.files) * 2, 1024))
+
+    for path in paths:
+        fileSystem.path_exists(path)
+
+    return _timed(fileSystem.path_exists, [(path,) for path in paths])
+
+
+def scenario_stats(ctx: Context) -> list[float]:
+    paths: list[str] = ctx.choices(ctx.info.files)
+    return _timed(_cold(fileSystem.stats), [(path,) for path in paths])
+
+
+def scenario_list_dir(ctx: Context) -> list[float]:
+    paths: list[str] = ctx.choices(ctx.info.dirs)
+    return _timed(_cold(fileSystem.list_dir), [(path,) for path in paths])
+
+
+def scenario_ls_long(ctx: Context) -> list[float]:
+    paths: list[str] = ctx.choices(ctx.info.dirs)
+    return _timed(_cold(_ls_long), [(path,) for path in paths])
+
+
+def scenario_make_dir(ctx: Context) -> list[float]:
+    fileSystem.make_dir("/bench_make_dir")
+    paths: list[str] = [f"/bench_make_dir/d{i}" for i in range(ctx.ops)]
+
+    return _timed(fileSystem.make_dir, [(path,) for path in paths])
+
+
+def scenario_touch(ctx: Context) -> list[float]:
+    fileSystem.make_dir("/bench_touch")
+    paths: list[str] = [f"/bench_touch/f{i}" for i in range(ctx.ops)]
+
+    return _timed(fileSystem.touch, [(path,) for path in paths])
+
+
+def scenario_copy_file(ctx: Context) -> list[float]:
+    fileSystem.make_dir("/bench_copy")
+    sources: list[str] = ctx.choices(ctx.info.files)
+
+    return _timed(
+        fileSystem.copy_file,
+        [(src, f"/bench_copy/f{i}") for i, src in enumerate(sources)],
+    )
+
+
+def scenario_move_file(ctx: Context) -> list[float]:
+    fileSystem.make_dir("/bench_move")
+    # Each file can only be moved away once
+    sources: list[str] = random.Random(ctx.seed).sample(
+        ctx.info.files, min(ctx.ops, len(ctx.info.files))
+    )
+
+    return _timed(
+        fileSystem.move,
+        [(src, f"/bench_move/f{i}") for i, src in enumerate(sources)],
+    )
+
+
+def scenario_move_dir(ctx: Context) -> list[float]:
+    # A top level directory holds 1/fanout of the tree
+    src: str = ctx.info.top_dirs[0]
+    dest: str = "/bench_moved"
+    moves: list[tuple[str, str]] = [
+        (src, dest) if i % 2 == 0 else (dest, src) for i in range(ctx.ops)
+    ]
+
+    times: list[float] = _timed(fileSystem.move, moves)
+
+    if ctx.ops % 2:
+        fileSystem.move(dest, src)
+
+    return times
+
+
+def scenario_remove_tree(ctx: Context) -> list[float]:
+    # Each removes 1/fanout of the tree, leaving the first for move_dir
+    paths: list[str] = ctx.info.top_dirs[1:]
+
+    return _timed(_cold(fileSystem.remove_tree), [(path,) for path in paths])
+
+
+# name -> (scenario, whether it leaves the tree unchanged)
+SCENARIOS: dict[str, tuple[Callable[[Context], list[float]], bool]] = {
+    "csv_to_table": (scenario_csv_to_table, True),
+    "path_exists_cold": (scenario_path_exists_cold, True),
+    "path_exists_warm": (scenario_path_exists_warm, True),
+    "stats": (scenario_stats, True),
+    "list_dir": (scenario_list_dir, True),
+    "ls_long": (scenario_ls_long, True),
+    "make_dir": (scenario_make_dir, False),
+    "touch": (scenario_touch, False),
+    "copy_file": (scenario_copy_file, False),
+    "move_file": (scenario_move_file, False),
+    "move_dir": (scenario_move_dir, False),
+    "remove_tree": (scenario_remove_tree, False),
+}
+
+
+def summarize(times: list[float]) -> dict[str, float]:
+    """
+    Returns the number of operations, total seconds, operations per
+    second and mean, median and 99th percentile microseconds per operation.
+    """
+    ordered: list[float] = sorted(times)
+    total: float = sum(ordered)
+
+    def percentile(percent: float) -> float:
+        index: int = min(len(ordered) - 1, int(len(ordered) * percent / 100))
+        return ordered[index] * 1e6
+
+    return {
+        "ops": len(ordered),
+        "seconds": total,
+        "ops_per_second": len(ordered) / total if total else 0.0,
+        "mean_us": total / len(ordered) * 1e6,
+        "p50_us": percentile(50),
+        "p99_us": percentile(99),
+    }
+
+
+def run(ctx: Context, names: list[str], repeat: int) -> dict[str, dict]:
+    """
+    Runs the named scenarios in SCENARIOS order and returns the summary of
+    each, keeping the fastest of repeat runs for those that change nothing.
+    """
+    results: dict[str, dict] = {}
+
+    for name, (scenario, read_only) in SCENARIOS.items():
+        if name not in names:
+            continue
+
+        runs: list[dict] = [
+            summarize(scenario(ctx)) for _ in range(repeat if read_only else 1)
+        ]
+        results[name] = min(runs, key=lambda summary: summary["mean_us"])
+        print(f"{name:>18} {results[name]['mean_us']:>12.1f}us", file=sys.stderr)
+
+    return results
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict], threshold: float) -> bool:
+    """
+    Prints each scenario's mean time per operation against the baseline's
+    and returns whether any is slower than the baseline by more than
+    threshold, a fraction.
+    """
+    regressed: bool = False
+
+    print(
+        f"{'scenario':>18} {'baseline':>12} {'current':>12} {'change':>8}",
+        file=sys.stderr,
+    )
+
+    for name, summary in results.items():
+        if name not in baseline:
+            print(f"{name:>18} {'-':>12} {summary['mean_us']:>10.1f}us", file=sys.stderr)
+            continue
+
+        before: float = baseline[name]["mean_us"]
+        change: float = summary["mean_us"] / before - 1 if before else 0.0
+        slower: bool = change > threshold
+        regressed = regressed or slower
+        print(
+            f"{name:>18} {before:>10.1f}us {summary['mean_us']:>10.1f}us "
+            f"{change:>+7.0%}{'  REGRESSION' if slower else ''}",
+            file=sys.stderr,
+        )
+
+    return regressed
+
+
+def main() -> int:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="Benchmark file system operations on a synthetic tree."
+    )
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=10)
+    parser.add_argument("--files", type=int, default=20, help="files per directory")
+    parser.add_argument("--sizes", default="lognormal:8:2", help="see benchmarks.tree")
+    parser.add_argument("--content", action="store_true", help="store file content")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--ops", type=int, default=1000, help="operations per scenario")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS)
+    )
+    parser.add_argument("--output", help="JSON file to write, stdout by default")
+    parser.add_argument("--compare", help="JSON file of a previous run")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="slowdown counted as regression"
+    )
+    args = parser.parse_args()
+
+    if args.fanout < 2:
+        parser.error("--fanout must be at least 2")
+
+    tree: dict = {
+        "depth": args.depth,
+        "fanout": args.fanout,
+        "files": args.files,
+        "sizes": args.sizes,
+        "content": args.content,
+        "seed": args.seed,
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_file: str = os.path.join(directory, "tree.csv")
+        info: TreeInfo = write_tree(csv_file, **tree)
+        print(f"{info.entries} entries", file=sys.stderr)
+
+        fileSystem.set_db_path(os.path.join(directory, "bench.sqlite"))
+        fileSystem.set_table_name(TABLE_NAME)
+        # The other scenarios need the tree loaded, whether or not timed
+        fileSystem.csv_to_table(csv_file, TABLE_NAME)
+
+        ctx: Context = Context(info, csv_file, args.ops, args.seed)
+        results: dict[str, dict] = run(ctx, args.scenarios, args.repeat)
+        fileSystem.close()
+
+    report: dict = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "tree": tree,
+            "entries": info.entries,
+            "ops": args.ops,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=4)
+    else:
+        json.dump(report, sys.stdout, indent=4)
+        print()
+
+    if not args.compare:
+        return 0
+
+    with open(args.compare) as file:
+        baseline: dict = json.load(file)
+
+    if baseline["meta"].get("tree") != tree:
+        print("warning: baseline was run on a different tree", file=sys.stderr)
+
+    return 1 if compare(results, baseline["results"], args.threshold) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""
+Deterministic generator of large synthetic file system trees, written as
+a CSV file in the format read by fileSystem.csv_to_table().
+
+The tree has `fanout' directories under "/" and under every directory
+down to `depth' levels, and `files' files in every directory. File sizes
+follow a distribution given as a string:
+
+    fixed:N             every file is N bytes
+    uniform:A:B         between A and B bytes
+    lognormal:MU:SIGMA  e**X bytes where X is normal with mean MU, deviation SIGMA
+
+The same arguments and seed always give the same tree. Sizes only go in
+the file_size column unless content is requested, so millions of entries
+can be generated quickly.
+
+    python -m benchmarks.tree tree.csv --depth 4 --fanout 10 --files 100
+"""
+import argparse, csv, random, sys
+from collections.abc import Callable
+
+OWNERS: list[str] = ["root", "angel", "leslie", "user"]
+PERMISSIONS: dict[str, list[str]] = {
+    "directory": ["drwxr-xr-x", "drwxr-x---", "drwxrwxrwx"],
+    "file": ["-rw-r--r--", "-rwxr-xr-x", "-rw-------"],
+}
+
+
+class TreeInfo:
+    """
+    Summary of a generated tree: the number of entries and a sample of
+    directory and file paths, for benchmarks to pick paths from.
+    """
+
+    def __init__(self) -> None:
+        self.entries: int = 0
+        self.dirs: list[str] = []
+        self.files: list[str] = []
+        self.top_dirs: list[str] = []  # Directories right under "/"
+
+
+def size_distribution(spec: str, rng: random.Random) -> Callable[[], int]:
+    """
+    Returns a function drawing file sizes from the distribution in spec.
+    Raises ValueError for an unknown distribution.
+    """
+    name, *args = spec.split(":")
+    values: list[float] = [float(arg) for arg in args]
+
+    if name == "fixed" and len(values) == 1:
+        return lambda: int(values[0])
+    if name == "uniform" and len(values) == 2:
+        return lambda: rng.randint(int(values[0]), int(values[1]))
+    if name == "lognormal" and len(values) == 2:
+        return lambda: int(rng.lognormvariate(values[0], values[1]))
+
+    raise ValueError(f"unknown size distribution: '{spec}'")
+
+
+def _sample(
+    sample: list[str], path: str, seen: int, size: int, rng: random.Random
+) -> None:
+    """
+    Reservoir sampling: keeps a uniform sample of size paths out of seen.
+    """
+    if len(sample) < size:
+        sample.append(path)
+    else:
+        index: int = rng.randrange(seen)
+
+        if index < size:
+            sample[index] = path
+
+
+def write_tree(
+    file_name: str,
+    depth: int = 3,
+    fanout: int = 10,
+    files: int = 20,
+    sizes: str = "lognormal:8:2",
+    content: bool = False,
+    seed: int = 0,
+    sample_size: int = 1000,
+) -> TreeInfo:
+    """
+    Writes the tree described in the module docstring to file_name, one
+    row per entry, parents before their children. If content is True,
+    files also get content of their size, capped at 64 KiB. Returns a
+    TreeInfo with up to sample_size directory and file paths.
+    """
+    rng: random.Random = random.Random(seed)
+    sampler: random.Random = random.Random(seed + 1)
+    draw_size: Callable[[], int] = size_distribution(sizes, rng)
+    info: TreeInfo = TreeInfo()
+    next_id: int = 1
+    dirs_seen: int = 0
+    files_seen: int = 0
+
+    def row(pid: int, name: str, file_type: str, size: int) -> list:
+        owner: str = rng.choice(OWNERS)
+        mtime: str = (
+            f"20{rng.randint(10, 24)}-{rng.randint(1, 12):02}-{rng.randint(1, 28):02} "
+            f"{rng.randint(0, 23):02}:{rng.randint(0, 59):02}:{rng.randint(0, 59):02}"
+        )
+        data: str = "x" * min(size, 64 * 1024) if content and file_type == "file" else ""
+
+        return [
+            next_id,
+            pid,
+            name,
+            file_type,
+            size,
+            owner,
+            owner,
+            rng.choice(PERMISSIONS[file_type]),
+            mtime,
+            data,
+        ]
+
+    with open(file_name, "w", newline="") as file:
+        writer = csv.writer(file)
+        # Breadth first, so every parent is written before its children
+        level: list[tuple[int, str]] = [(0, "")]
+
+        for current in range(depth):
+            next_level: list[tuple[int, str]] = []
+
+            for pid, path in level:
+                for i in range(fanout):
+                    dir_path: str = f"{path}/d{i}"
+                    writer.writerow(row(pid, f"d{i}", "directory", 0))
+                    next_level.append((next_id, dir_path))
+                    dirs_seen += 1
+                    _sample(info.dirs, dir_path, dirs_seen, sample_size, sampler)
+
+                    if current == 0:
+                        info.top_dirs.append(dir_path)
+
+                    next_id += 1
+
+                    for j in range(files):
+                        file_path: str = f"{dir_path}/f{j}.txt"
+                        writer.writerow(row(next_level[-1][0], f"f{j}.txt", "file", draw_size()))
+                        files_seen += 1
+                        _sample(info.files, file_path, files_seen, sample_size, sampler)
+                        next_id += 1
+
+            level = next_level
+
+    info.entries = next_id - 1
+
+    return info
+
+
+def main() -> int:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="Generate a synthetic file system tree as CSV."
+    )
+    parser.add_argument("file", help="CSV file to write")
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=10)
+    parser.add_argument("--files", type=int, default=20, help="files per directory")
+    parser.add_argument("--sizes", default="lognormal:8:2")
+    parser.add_argument("--content", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    info: TreeInfo = write_tree(
+        args.file,
+        args.depth,
+        args.fanout,
+        args.files,
+        args.sizes,
+        args.content,
+        args.seed,
+    )
+    print(f"{info.entries} entries written to {args.file}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+from collections.abc import Iterator
+from .TockenizeFlags import tockenizeFlags
+from .InvalidFlagsMsg import invalidFlagsMsg
+from .InputLines import inputLines
+
+cat_flags: set[str] = {"--help", "-n"}
+
+
+def cat(**kwargs) -> Iterator[str]:
+    """
+    NAME
+        cat
+
+    DESCRIPTION
+        cat             : prints the content of files, or of its input
+            --help      : displays how to use the cat command
+            -n          : numbers the lines
+
+    EXAMPLE
+        `cat stuff.txt'             : prints the content of stuff.txt
+        `cat -n stuff.txt'          : prints stuff.txt with line numbers
+        `cat big.txt | head -n 5'   : prints the first 5 lines of big.txt
+    """
+    params: list[str] = kwargs.get("params", [])
+    flags: set[str] = tockenizeFlags(kwargs.get("flags", []))
+    lines: Iterator[str] | None = kwargs.get("lines")
+
+    # Check if invalid flags are present
+    if not flags.issubset(cat_flags):
+        yield invalidFlagsMsg(cat, cat_flags, flags)
+    # Provide help info if --help flag present
+    elif "--help" in flags:
+        yield cat.__doc__
+    # If other valid flags or none
+    else:
+        number: bool = "-n" in flags
+
+        for count, line in enumerate(inputLines(cat, params, lines), 1):
+            yield f"{count:6}\t{line}" if number else line
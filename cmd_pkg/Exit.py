@@ -1,3 +1,4 @@
+from . import fileSystem
 from .TockenizeFlags import tockenizeFlags
 from .InvalidFlagsMsg import invalidFlagsMsg
 
@@ -31,8 +32,9 @@ def exit(**kwargs) -> str:
         # If more than 0 arguments
         if len(params):
             result = f"{exit.__name__}: too many arguments"
-        # Terminate shell
+        # Close database connections, then terminate shell
         else:
+            fileSystem.close()
             raise SystemExit()
 
     # Returns empty string if normal usage.
@@ -0,0 +1,169 @@
+import datetime, re
+from collections.abc import Iterator
+from . import fileSystem
+
+# Predicate -> whether it takes an argument
+find_predicates: dict[str, bool] = {
+    "--help": False,
+    "-name": True,
+    "-type": True,
+    "-size": True,
+    "-mtime": True,
+    "-perm": True,
+    "-mindepth": True,
+    "-maxdepth": True,
+}
+
+# Suffix of -size -> bytes per unit, 512-byte blocks without one
+size_units: dict[str, int] = {"": 512, "c": 1, "k": 1024, "M": 1024**2, "G": 1024**3}
+
+
+def parse_size(arg: str) -> tuple[int | None, int | None] | None:
+    """
+    Converts the argument of -size to (min_size, max_size) in bytes, as
+    find does: the size is rounded up to whole units, then compared with
+    N, greater than for +N, less than for -N and equal otherwise. Returns
+    None if invalid.
+    """
+    match: re.Match | None = re.fullmatch(r"([+-]?)(\d+)([ckMG]?)", arg)
+
+    if not match:
+        return None
+
+    sign, number, suffix = match.groups()
+    count: int = int(number)
+    unit: int = size_units[suffix]
+
+    if sign == "+":
+        return count * unit + 1, None
+    if sign == "-":
+        return None, (count - 1) * unit
+
+    return (count - 1) * unit + 1, count * unit
+
+
+def parse_mtime(arg: str) -> tuple[str | None, str | None] | None:
+    """
+    Converts the argument of -mtime to (newer_than, older_than) times: less
+    than N days ago for -N, more than N whole days ago for +N and N whole
+    days ago otherwise. Returns None if invalid.
+    """
+    match: re.Match | None = re.fullmatch(r"([+-]?)(\d+)", arg)
+
+    if not match:
+        return None
+
+    sign, number = match.groups()
+    days: int = int(number)
+    now: datetime.datetime = datetime.datetime.now()
+
+    def days_ago(count: int) -> str:
+        return (now - datetime.timedelta(days=count)).isoformat(
+            sep=" ", timespec="seconds"
+        )
+
+    if sign == "-":
+        return days_ago(days), None
+    if sign == "+":
+        return None, days_ago(days + 1)
+
+    return days_ago(days + 1), days_ago(days)
+
+
+def find(**kwargs) -> Iterator[str]:
+    """
+    NAME
+        find
+
+    DESCRIPTION
+        find                : prints the paths under a directory, the directory included,
+                              matching all the predicates given, as they are found
+            --help          : displays how to use the find command
+            -name PATTERN   : file name matches the pattern, with *, ? and [...]
+            -type f|d       : is a file (f) or a directory (d)
+            -size [+-]N     : size is more than (+), less than (-) or exactly N units,
+                              512-byte blocks, or bytes with c, KiB with k, MiB with M,
+                              GiB with G after N
+            -mtime [+-]N    : modified more than (+), less than (-) or exactly N days ago
+            -perm [-]MODE   : permissions are exactly MODE, in octal, or with -,
+                              include all of the permissions in MODE
+            -maxdepth N     : descends at most N directories below the starting point
+            -mindepth N     : prints nothing less than N directories below it
+
+    EXAMPLE
+        `find'                          : prints every path under the current directory
+        `find / -name "*.exe"'          : prints every path ending in .exe
+        `find /home -type d -maxdepth 1': prints /home and the directories in it
+        `find / -size +1k -mtime -30'   : prints files over 1KiB modified in the last 30 days
+        `find . -perm -700'             : prints what the owner can read, write and execute
+    """
+    args: list[str] = list(kwargs.get("args", []))
+    tops: list[str] = []
+    filters: dict = {}
+
+    # Starting points come before the first predicate
+    while args and not args[0].startswith("-"):
+        tops.append(args.pop(0))
+
+    while args:
+        predicate: str = args.pop(0)
+
+        if predicate not in find_predicates:
+            yield f"{find.__name__}: unknown predicate `{predicate}'"
+            return
+        if predicate == "--help":
+            yield find.__doc__
+            return
+        if not args:
+            yield f"{find.__name__}: missing argument to `{predicate}'"
+            return
+
+        arg: str = args.pop(0)
+        valid: bool = True
+
+        if predicate == "-name":
+            filters["name"] = arg
+        elif predicate == "-type":
+            valid = arg in ("f", "d")
+            filters["file_type"] = "file" if arg == "f" else "directory"
+        elif predicate == "-size":
+            size: tuple | None = parse_size(arg)
+            valid = size is not None
+            if valid:
+                filters["min_size"], filters["max_size"] = size
+        elif predicate == "-mtime":
+            mtime: tuple | None = parse_mtime(arg)
+            valid = mtime is not None
+            if valid:
+                filters["newer_than"], filters["older_than"] = mtime
+        elif predicate == "-perm":
+            mode: str = arg.removeprefix("-")
+            valid = re.fullmatch(r"[0-7]{1,3}", mode) is not None
+            if valid:
+                filters["perm"] = int(mode, 8)
+                filters["perm_all"] = arg.startswith("-")
+        else:
+            valid = arg.isdigit()
+            if valid:
+                filters[predicate.removeprefix("-")] = int(arg)
+
+        if not valid:
+            yield f"{find.__name__}: invalid argument `{arg}' to `{predicate}'"
+            return
+
+    # Without a starting point, searches the current directory
+    if not tops:
+        tops.append(".")
+
+    for top in tops:
+        prefix: str = fileSystem.abs_path(top).rstrip("/")
+
+        try:
+            for path in fileSystem.find(top, **filters):
+                # Paths are printed starting as the starting point was given
+                if path == prefix or path == "/":
+                    yield top
+                else:
+                    yield top.rstrip("/") + path[len(prefix) :]
+        except FileNotFoundError:
+            yield f"{find.__name__}: '{top}': No such file or directory"
@@ -0,0 +1,64 @@
+import re
+from collections.abc import Iterator
+from .TockenizeFlags import tockenizeFlags
+from .InvalidFlagsMsg import invalidFlagsMsg
+from .InputLines import inputLines
+
+grep_flags: set[str] = {"--help", "-i", "-v", "-n", "-c"}
+
+
+def grep(**kwargs) -> Iterator[str]:
+    """
+    NAME
+        grep
+
+    DESCRIPTION
+        grep PATTERN    : prints the lines of files, or of its input, matching
+                          the regular expression PATTERN
+            --help      : displays how to use the grep command
+            -i          : ignores case
+            -v          : prints the lines not matching instead
+            -n          : prefixes each line with its line number
+            -c          : prints only the number of matching lines
+
+    EXAMPLE
+        `grep main sys/main.c'  : prints the lines of sys/main.c containing main
+        `ls -l | grep -v root'  : prints the entries not owned by root
+    """
+    params: list[str] = list(kwargs.get("params", []))
+    flags: set[str] = tockenizeFlags(kwargs.get("flags", []))
+    lines: Iterator[str] | None = kwargs.get("lines")
+
+    # Check if invalid flags are present
+    if not flags.issubset(grep_flags):
+        yield invalidFlagsMsg(grep, grep_flags, flags)
+    # Provide help info if --help flag present
+    elif "--help" in flags:
+        yield grep.__doc__
+    elif not params:
+        yield f"{grep.__name__}: missing pattern"
+    # If other valid flags or none
+    else:
+        try:
+            pattern: re.Pattern = re.compile(
+                params.pop(0), re.IGNORECASE if "-i" in flags else 0
+            )
+        except re.error as error:
+            yield f"{grep.__name__}: invalid pattern: {error}"
+            return
+
+        invert: bool = "-v" in flags
+        number: bool = "-n" in flags
+        matches: int = 0
+
+        for count, line in enumerate(inputLines(grep, params, lines), 1):
+            if (pattern.search(line) is None) != invert:
+                continue
+
+            matches += 1
+
+            if "-c" not in flags:
+                yield f"{count}:{line}" if number else line
+
+        if "-c" in flags:
+            yield str(matches)
@@ -0,0 +1,56 @@
+from collections.abc import Iterator
+from itertools import islice
+from .TockenizeFlags import tockenizeFlags
+from .InvalidFlagsMsg import invalidFlagsMsg
+from .InputLines import inputLines
+
+head_flags: set[str] = {"--help", "-n"}
+
+
+def head(**kwargs) -> Iterator[str]:
+    """
+    NAME
+        head
+
+    DESCRIPTION
+        head            : prints the first 10 lines of files, or of its input
+            --help      : displays how to use the head command
+            -n NUM      : prints the first NUM lines instead, also -nNUM
+
+    EXAMPLE
+        `head stuff.txt'            : prints the first 10 lines of stuff.txt
+        `cat big.txt | head -n 5'   : prints the first 5 lines of big.txt
+    """
+    params: list[str] = list(kwargs.get("params", []))
+    flagList: list[str] = []
+
+    # -n NUM may also be given as -nNUM, the number then goes to params
+    for flag in kwargs.get("flags", []):
+        if flag.startswith("-n") and flag[2:].isdigit():
+            flagList.append("-n")
+            params.insert(0, flag[2:])
+        else:
+            flagList.append(flag)
+
+    flags: set[str] = tockenizeFlags(flagList)
+    lines: Iterator[str] | None = kwargs.get("lines")
+
+    # Check if invalid flags are present
+    if not flags.issubset(head_flags):
+        yield invalidFlagsMsg(head, head_flags, flags)
+    # Provide help info if --help flag present
+    elif "--help" in flags:
+        yield head.__doc__
+    # If other valid flags or none
+    else:
+        count: int = 10
+
+        # The number after -n is parsed as the first param
+        if "-n" in flags:
+            if not params or not params[0].isdigit():
+                yield f"{head.__name__}: invalid number of lines"
+                return
+            count = int(params.pop(0))
+
+        # Stops reading the input once count lines have been printed
+        yield from islice(inputLines(head, params, lines), count)
@@ -0,0 +1,67 @@
+from collections.abc import Iterator
+from types import FunctionType
+from . import fileSystem
+
+_read_size: int = 64 * 1024  # Bytes read from a file at a time
+
+
+def fileLines(path: str) -> Iterator[str]:
+    """
+    Yields the lines of a file in the file system without their line
+    endings, reading it a block at a time, so only the lines actually
+    consumed are read.
+    """
+    with fileSystem.open_file(path) as file:
+        rest: bytes = b""
+
+        while block := file.read(_read_size):
+            lines: list[bytes] = (rest + block).split(b"\n")
+            rest = lines.pop()
+
+            for line in lines:
+                yield line.decode(errors="replace")
+
+        if rest:
+            yield rest.decode(errors="replace")
+
+
+def fileBlocks(path: str) -> Iterator[bytes]:
+    """
+    Yields the content of a file in the file system a block at a time.
+    """
+    with fileSystem.open_file(path) as file:
+        while block := file.read(_read_size):
+            yield block
+
+
+def inputLines(
+    func: FunctionType,
+    params: list[str],
+    lines: Iterator[str] | None,
+    errors: list[str] | None = None,
+) -> Iterator[str]:
+    """
+    Yields the input lines of a command: the lines of each file in params,
+    or if there are none, the lines piped in from the previous command.
+    A file that cannot be read yields an error message in its place, or
+    if errors is given, adds the message to it instead.
+    """
+    if not params:
+        yield from lines if lines is not None else ()
+
+    for param in params:
+        message: str = ""
+
+        try:
+            yield from fileLines(param)
+        except FileNotFoundError:
+            message = f"{func.__name__}: {param}: No such file or directory"
+        except IsADirectoryError:
+            message = f"{func.__name__}: {param}: Is a directory"
+
+        if not message:
+            continue
+        if errors is None:
+            yield message
+        else:
+            errors.append(message)
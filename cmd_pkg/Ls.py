@@ -1,4 +1,3 @@
-import os, stat, datetime, pwd, grp
 from . import fileSystem
 from .TockenizeFlags import tockenizeFlags
 from .InvalidFlagsMsg import invalidFlagsMsg
@@ -9,10 +8,23 @@ DARK_GREEN = "\033[32m"  # Green text
 BLUE = "\033[94m"  # Blue text
 RED = "\033[91m"  # Red text
 
+# Columns read for each listing, never the file content
+short_columns: list[str] = ["file_name", "file_type"]
+long_columns: list[str] = [
+    "file_name",
+    "file_type",
+    "file_size",
+    "owner_name",
+    "group_name",
+    "permissions",
+    "modification_time",
+]
+
 ls_flags: set[str] = {
     "-l",
     "-a",
     "-h",
+    "-R",
     "--help",
 }
 
@@ -32,6 +44,124 @@ def format_bytes(num_bytes: float) -> str:
     return f"{num_bytes:.1f}{power_labels[n]}" if n > 0 else f"{num_bytes:.0f}"
 
 
+def format_entries(
+    dir_entries: list[fileSystem.Entry],
+    showHidden: bool,
+    longListing: bool,
+    humanReadable: bool,
+    color: bool = True,
+) -> str:
+    """
+    Formats the entries of one directory the way `ls' shows them. Without
+    color, as when piped to another command, names are not colored and
+    the short listing puts one name per line.
+    """
+    line: list[str] = []
+
+    def paint(code: str, text: str) -> str:
+        return code + text + RESET if color else text
+
+    for entry in dir_entries:
+        RED_MODE = False
+        # If '-a' flag enabled, show hidden files
+        if not entry.file_name.startswith(".") or showHidden:
+            # if '-l' flag enabled, show long listing
+            if longListing:
+                mode: str = entry.permissions
+
+                if entry.permissions.find("x") == 3:
+                    line.append(paint(RED, mode))
+                    RED_MODE = True
+                else:
+                    line.append(paint(DARK_GREEN, mode))
+                line.append("\t")
+
+                line.append(entry.owner_name)
+                line.append("\t")
+                line.append(entry.group_name)
+                line.append("\t")
+
+                # if '-h' flag enabled, show human readable sizes
+                if humanReadable:
+                    line.append(str(format_bytes(entry.file_size)))
+                    line.append("\t")
+                else:
+                    line.append(str(entry.file_size))
+                    line.append("\t")
+
+                # time of last modification
+                line.append(entry.modification_time)
+                line.append("\t")
+                # if ls flags are subset of flags print in contents in colors
+                if RED_MODE and entry.file_type != "directory":
+                    line.append(paint(RED, entry.file_name))
+                elif entry.file_type == "directory":
+                    line.append(paint(BLUE + BOLD, entry.file_name))
+                else:
+                    line.append(paint(DARK_GREEN, entry.file_name))
+
+                line.append("\n")
+            # else show short listing
+            else:
+                # Name
+                if entry.file_type == "directory":
+                    line.append(paint(BLUE + BOLD, entry.file_name))
+                else:
+                    line.append(paint(DARK_GREEN, entry.file_name))
+
+                line.append("\t" if color else "\n")
+
+    return "".join(line)
+
+
+def ls_recursive(
+    params: list[str],
+    showHidden: bool,
+    longListing: bool,
+    humanReadable: bool,
+    color: bool = True,
+):
+    """
+    Generates the output of `ls -R' one directory at a time, each listing
+    under a "path:" header. The tree of every param is read with a single
+    query through fileSystem.walk_entries().
+    """
+    columns: list[str] = long_columns if longListing else short_columns
+
+    for param in params:
+        if not fileSystem.path_exists(param):
+            yield f"{ls.__name__}: cannot access '{param}': No such file or directory"
+            continue
+
+        top: str = fileSystem.abs_path(param)
+
+        if not fileSystem.is_dir(top):
+            yield format_entries(
+                [fileSystem.stats(top)], True, longListing, humanReadable, color
+            )
+            continue
+
+        for dirpath, dir_entries in fileSystem.walk_entries(top, columns):
+            relative: str = dirpath[len(top) :] if top != "/" else dirpath[1:]
+            relative = relative.lstrip("/")
+
+            # Hidden directories are only descended into with '-a'
+            if not showHidden and any(
+                name.startswith(".") for name in relative.split("/") if name
+            ):
+                continue
+
+            if relative:
+                yield f"{param.rstrip('/')}/{relative}:"
+            else:
+                yield f"{param}:"
+
+            yield format_entries(
+                dir_entries, showHidden, longListing, humanReadable, color
+            )
+            yield ""
+
+
 def ls(**kwargs) -> str:
     """
     NAME
@@ -43,11 +173,13 @@ def ls(**kwargs) -> str:
             -l      : lists the contents of a directory in long format
             -a      : lists the contents of a directory including hidden files
             -h      : lists the contents of a directory in human readable format
+            -R      : lists subdirectories recursively
 
     EXAMPLE
         `ls'        : lists the contents of a directory in shor format
         `ls -l'     : lists the contents of a directory in long format
         `ls -lah`   : lists the contents of a directory in long format including hidden files in human readable format
+        `ls -R /'   : lists every directory in the filesystem
     """
     params: list[str] = kwargs.get("params", [])
     flags: set[str] = tockenizeFlags(kwargs.get("flags", []))
@@ -65,17 +197,23 @@ def ls(**kwargs) -> str:
     elif "--help" in flags:
         result = ls.__doc__
     # If other valid flags or none
-    elif stdout:
+    else:
         showHidden: bool = "-a" in flags
         longListing: bool = "-l" in flags
         humanReadable: bool = "-h" in flags
+        # Output piped to another command, or in batch mode, is left plain
+        color: bool = stdout and kwargs.get("color", True)
+
+        # Large trees are listed lazily, one directory at a time
+        if "-R" in flags:
+            return ls_recursive(
+                params, showHidden, longListing, humanReadable, color
+            )
 
         contents: list[list[str]] = []
 
         # Perform ls command for all params (directories)
         for param in params:
-            line: list[str] = []
-
             # Provide error message if invalid directory
             if not fileSystem.path_exists(param):
                 contents.append(
@@ -86,63 +224,15 @@ def ls(**kwargs) -> str:
                 if not len(params) == 1:
                     contents.append(f"{param}:")
 
-                dir_entries: list[fileSystem.Entry] = fileSystem.list_dir(param)
-
-                for entry in dir_entries:
-                    RED_MODE = False
-                    # If '-a' flag enabled, show hidden files
-                    if not entry.file_name.startswith(".") or showHidden:
-                        # if '-l' flag enabled, show long listing
-                        if longListing:
-                            mode: str = entry.permissions
-
-                            if entry.permissions.find("x") == 3:
-                                line.append(RED + mode + RESET)
-                                RED_MODE = True
-                            else:
-                                line.append(DARK_GREEN + mode + RESET)
-                            line.append("\t")
-
-                            line.append(entry.owner_name)
-                            line.append("\t")
-                            line.append(entry.group_name)
-                            line.append("\t")
-
-                            # if '-h' flag enabled, show human readable sizes
-                            if humanReadable:
-                                line.append(str(format_bytes(entry.file_size)))
-                                line.append("\t")
-                            else:
-                                line.append(str(entry.file_size))
-                                line.append("\t")
-
-                            # time of last modification
-                            line.append(entry.modification_time)
-                            line.append("\t")
-                            # if ls flags are subset of flags print in contents in colors
-                            if RED_MODE and not fileSystem.is_dir(
-                                os.path.join(param, entry.file_name)
-                            ):
-                                line.append(RED + entry.file_name + RESET)
-                            elif fileSystem.is_dir(
-                                os.path.join(param, entry.file_name)
-                            ):
-                                line.append(BLUE + BOLD + entry.file_name + RESET)
-                            else:
-                                line.append(DARK_GREEN + entry.file_name + RESET)
-
-                            line.append("\n")
-                        # else show short listing
-                        else:
-                            # Name
-                            if fileSystem.is_dir(os.path.join(param, entry.file_name)):
-                                line.append(BLUE + BOLD + entry.file_name + RESET)
-                            else:
-                                line.append(DARK_GREEN + entry.file_name + RESET)
-
-                            line.append("\t")
-
-                contents.append("".join(line))
+                dir_entries: list[fileSystem.Entry] = fileSystem.list_dir(
+                    param, long_columns if longListing else short_columns
+                )
+
+                contents.append(
+                    format_entries(
+                        dir_entries, showHidden, longListing, humanReadable, color
+                    )
+                )
 
             result = "\n".join(contents)
 
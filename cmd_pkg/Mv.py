@@ -37,9 +37,29 @@ def mv(**kwargs) -> str:
                 result = (
                     f"{mv.__name__}: cannot move '{error.filename}': {error.strerror}"
                 )
-            # If src and dest are the same
+            # If a directory in dest is a file
+            except NotADirectoryError as error:
+                result = (
+                    f"{mv.__name__}: cannot move '{params[0]}' to '{params[1]}': "
+                    f"{error.strerror}"
+                )
             except OSError as error:
-                result = f"{mv.__name__}: '{error.filename}' is '{error.filename2}'"
+                # If src and dest are the same
+                if error.filename2 is not None and error.filename == error.filename2:
+                    result = (
+                        f"{mv.__name__}: '{error.filename}' is '{error.filename2}'"
+                    )
+                # If dest is inside src
+                elif error.filename2 is not None:
+                    result = (
+                        f"{mv.__name__}: cannot move '{error.filename}' to a "
+                        f"subdirectory of itself, '{error.filename2}'"
+                    )
+                else:
+                    result = (
+                        f"{mv.__name__}: cannot move '{params[0]}' to "
+                        f"'{params[1]}': {error.strerror}"
+                    )
         else:
             result = f"{mv.__name__}: missing file operand(s)"
 
@@ -0,0 +1,70 @@
+from . import perfStats
+from .TockenizeFlags import tockenizeFlags
+from .InvalidFlagsMsg import invalidFlagsMsg
+
+perf_flags: set[str] = {"--help", "-t"}
+
+
+def perf(**kwargs) -> str:
+    """
+    NAME
+        perf
+
+    DESCRIPTION
+        perf            : shows the time, SQL statements, connections opened and bytes
+                          of file content of each file system operation, for the last
+                          command and since instrumentation was turned on
+            --help      : displays how to use the perf command
+            -t MS       : with `on', logs operations slower than MS milliseconds to stderr
+
+    EXAMPLE
+        `perf on'       : turns instrumentation on
+        `perf on -t 50' : turns instrumentation on and logs operations slower than 50ms
+        `perf'          : shows the numbers of the last command and the totals
+        `perf reset'    : clears the totals
+        `perf off'      : turns instrumentation off
+    """
+    params: list[str] = list(kwargs.get("params", []))
+    flags: set[str] = tockenizeFlags(kwargs.get("flags", []))
+    result: str = ""
+
+    # Check if invalid flags are present
+    if not flags.issubset(perf_flags):
+        result = invalidFlagsMsg(perf, perf_flags, flags)
+    # Provide help info if --help flag present
+    elif "--help" in flags:
+        result = perf.__doc__
+    # If other valid flags or none
+    else:
+        slow_ms: float | None = None
+
+        # The number after -t is parsed as a param
+        if "-t" in flags:
+            numbers: list[str] = [p for p in params if p.replace(".", "", 1).isdigit()]
+
+            if not numbers:
+                return f"{perf.__name__}: invalid threshold"
+
+            params.remove(numbers[0])
+            slow_ms = float(numbers[0])
+
+        action: str = params[0] if params else ""
+
+        if len(params) > 1 or action not in ("", "on", "off", "reset"):
+            result = f"{perf.__name__}: expected one of on, off, reset"
+        elif action == "on":
+            perfStats.enable(slow_ms)
+        elif action == "off":
+            perfStats.disable()
+        elif action == "reset":
+            perfStats.reset()
+        elif not perfStats.is_enabled():
+            result = f"{perf.__name__}: instrumentation is off, turn it on with `perf on'"
+        else:
+            line, last = perfStats.last_command()
+            result = (
+                f"last command: {line}\n{perfStats.format_stats(last)}\n\n"
+                f"since turned on or reset:\n{perfStats.format_stats(perfStats.totals())}"
+            )
+
+    return result
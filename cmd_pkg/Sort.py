@@ -0,0 +1,59 @@
+from collections.abc import Iterator
+from .TockenizeFlags import tockenizeFlags
+from .InvalidFlagsMsg import invalidFlagsMsg
+from .InputLines import inputLines
+
+sort_flags: set[str] = {"--help", "-r", "-n", "-u"}
+
+
+def numeric_key(line: str) -> tuple[float, str]:
+    """
+    Sort key for -n: the number at the start of the line, 0 if none.
+    """
+    number: str = line.lstrip().split(maxsplit=1)[0] if line.strip() else ""
+
+    try:
+        return float(number), line
+    except ValueError:
+        return 0.0, line
+
+
+def sort(**kwargs) -> Iterator[str]:
+    """
+    NAME
+        sort
+
+    DESCRIPTION
+        sort            : prints the lines of files, or of its input, sorted
+            --help      : displays how to use the sort command
+            -r          : sorts in reverse order
+            -n          : sorts by the number at the start of each line
+            -u          : prints repeated lines only once
+
+    EXAMPLE
+        `sort stuff.txt'        : prints the lines of stuff.txt sorted
+        `ls -l | sort -r'       : prints the long listing in reverse order
+    """
+    params: list[str] = kwargs.get("params", [])
+    flags: set[str] = tockenizeFlags(kwargs.get("flags", []))
+    lines: Iterator[str] | None = kwargs.get("lines")
+
+    # Check if invalid flags are present
+    if not flags.issubset(sort_flags):
+        yield invalidFlagsMsg(sort, sort_flags, flags)
+    # Provide help info if --help flag present
+    elif "--help" in flags:
+        yield sort.__doc__
+    # If other valid flags or none
+    else:
+        # Sorting needs all of the input before the first line is printed
+        errors: list[str] = []
+        result: list[str] = list(inputLines(sort, params, lines, errors))
+
+        if "-u" in flags:
+            result = list(dict.fromkeys(result))
+
+        result.sort(key=numeric_key if "-n" in flags else None, reverse="-r" in flags)
+
+        yield from errors
+        yield from result
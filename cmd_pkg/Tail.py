@@ -0,0 +1,56 @@
+from collections import deque
+from collections.abc import Iterator
+from .TockenizeFlags import tockenizeFlags
+from .InvalidFlagsMsg import invalidFlagsMsg
+from .InputLines import inputLines
+
+tail_flags: set[str] = {"--help", "-n"}
+
+
+def tail(**kwargs) -> Iterator[str]:
+    """
+    NAME
+        tail
+
+    DESCRIPTION
+        tail            : prints the last 10 lines of files, or of its input
+            --help      : displays how to use the tail command
+            -n NUM      : prints the last NUM lines instead, also -nNUM
+
+    EXAMPLE
+        `tail stuff.txt'            : prints the last 10 lines of stuff.txt
+        `cat big.txt | tail -n 5'   : prints the last 5 lines of big.txt
+    """
+    params: list[str] = list(kwargs.get("params", []))
+    flagList: list[str] = []
+
+    # -n NUM may also be given as -nNUM, the number then goes to params
+    for flag in kwargs.get("flags", []):
+        if flag.startswith("-n") and flag[2:].isdigit():
+            flagList.append("-n")
+            params.insert(0, flag[2:])
+        else:
+            flagList.append(flag)
+
+    flags: set[str] = tockenizeFlags(flagList)
+    lines: Iterator[str] | None = kwargs.get("lines")
+
+    # Check if invalid flags are present
+    if not flags.issubset(tail_flags):
+        yield invalidFlagsMsg(tail, tail_flags, flags)
+    # Provide help info if --help flag present
+    elif "--help" in flags:
+        yield tail.__doc__
+    # If other valid flags or none
+    else:
+        count: int = 10
+
+        # The number after -n is parsed as the first param
+        if "-n" in flags:
+            if not params or not params[0].isdigit():
+                yield f"{tail.__name__}: invalid number of lines"
+                return
+            count = int(params.pop(0))
+
+        # Only the last count lines are kept in memory
+        yield from deque(inputLines(tail, params, lines), maxlen=count)
@@ -0,0 +1,43 @@
+from collections.abc import Iterator
+from itertools import groupby
+from .TockenizeFlags import tockenizeFlags
+from .InvalidFlagsMsg import invalidFlagsMsg
+from .InputLines import inputLines
+
+uniq_flags: set[str] = {"--help", "-c", "-d"}
+
+
+def uniq(**kwargs) -> Iterator[str]:
+    """
+    NAME
+        uniq
+
+    DESCRIPTION
+        uniq            : prints the lines of files, or of its input, printing
+                          adjacent repeated lines only once
+            --help      : displays how to use the uniq command
+            -c          : prefixes each line with the number of repeats
+            -d          : prints only the lines that are repeated
+
+    EXAMPLE
+        `sort names.txt | uniq -c'  : counts how often each line appears
+    """
+    params: list[str] = kwargs.get("params", [])
+    flags: set[str] = tockenizeFlags(kwargs.get("flags", []))
+    lines: Iterator[str] | None = kwargs.get("lines")
+
+    # Check if invalid flags are present
+    if not flags.issubset(uniq_flags):
+        yield invalidFlagsMsg(uniq, uniq_flags, flags)
+    # Provide help info if --help flag present
+    elif "--help" in flags:
+        yield uniq.__doc__
+    # If other valid flags or none
+    else:
+        for line, group in groupby(inputLines(uniq, params, lines)):
+            repeats: int = sum(1 for _ in group)
+
+            if "-d" in flags and repeats < 2:
+                continue
+
+            yield f"{repeats:7} {line}" if "-c" in flags else line
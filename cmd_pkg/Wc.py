@@ -0,0 +1,89 @@
+from collections.abc import Iterable, Iterator
+from .TockenizeFlags import tockenizeFlags
+from .InvalidFlagsMsg import invalidFlagsMsg
+from .InputLines import fileBlocks
+
+wc_flags: set[str] = {"--help", "-l", "-w", "-c"}
+
+
+def countBlocks(blocks: Iterable[bytes]) -> dict[str, int]:
+    """
+    Returns the number of newlines, words and bytes in blocks of content,
+    keyed by the flags -l, -w and -c. A word split between blocks counts once.
+    """
+    counts: dict[str, int] = {"-l": 0, "-w": 0, "-c": 0}
+    inWord: bool = False  # If the previous block ended within a word
+
+    for block in blocks:
+        if not block:
+            continue
+
+        counts["-l"] += block.count(b"\n")
+        counts["-w"] += len(block.split()) - (inWord and not block[:1].isspace())
+        counts["-c"] += len(block)
+        inWord = not block[-1:].isspace()
+
+    return counts
+
+
+def wc(**kwargs) -> Iterator[str]:
+    """
+    NAME
+        wc
+
+    DESCRIPTION
+        wc              : prints the number of lines, words and bytes of files,
+                          or of its input
+            --help      : displays how to use the wc command
+            -l          : prints the number of lines
+            -w          : prints the number of words
+            -c          : prints the number of bytes
+
+    EXAMPLE
+        `wc stuff.txt'  : prints the lines, words and bytes of stuff.txt
+        `ls | wc -l'    : prints the number of entries in the directory
+    """
+    params: list[str] = kwargs.get("params", [])
+    flags: set[str] = tockenizeFlags(kwargs.get("flags", []))
+    lines: Iterator[str] | None = kwargs.get("lines")
+
+    # Check if invalid flags are present
+    if not flags.issubset(wc_flags):
+        yield invalidFlagsMsg(wc, wc_flags, flags)
+    # Provide help info if --help flag present
+    elif "--help" in flags:
+        yield wc.__doc__
+    # If other valid flags or none
+    else:
+        shown: list[str] = [flag for flag in ("-l", "-w", "-c") if flag in flags]
+        shown = shown if shown else ["-l", "-w", "-c"]
+        totals: dict[str, int] = dict.fromkeys(shown, 0)
+
+        # Counts each file on its own, or the piped input as a whole
+        for param in params if params else [None]:
+            # Files are counted as stored, piped lines as printed
+            blocks: Iterable[bytes] = (
+                fileBlocks(param)
+                if param
+                else (line.encode() + b"\n" for line in lines or ())
+            )
+
+            try:
+                counts: dict[str, int] = countBlocks(blocks)
+            # A file that could not be read only gets its error message
+            except FileNotFoundError:
+                yield f"{wc.__name__}: {param}: No such file or directory"
+                continue
+            except IsADirectoryError:
+                yield f"{wc.__name__}: {param}: Is a directory"
+                continue
+
+            for flag in shown:
+                totals[flag] += counts[flag]
+
+            yield " ".join(f"{counts[flag]:7}" for flag in shown) + (
+                f" {param}" if param else ""
+            )
+
+        if len(params) > 1:
+            yield " ".join(f"{totals[flag]:7}" for flag in shown) + " total"
@@ -1,13 +1,61 @@
-from .Cd import cd
-from .Exit import exit
-from .Clear import clear
-from .Ls import ls
-from .Mkdir import mkdir
-from .Pwd import pwd
-from .Rmdir import rmdir
-from .Rm import rm
-from .Cp import cp
-from .Mv import mv
-from .Touch import touch
-from .Chmod import chmod
-from . import fileSystem
+"""
+Shell commands, one per module. A command is looked up by name, e.g.
+cmd_pkg.ls, and its module is only imported on first use, so starting
+the shell does not pay for the commands it never runs.
+"""
+import importlib
+
+# Command name -> module it is defined in
+_commands: dict[str, str] = {
+    "cd": "Cd",
+    "exit": "Exit",
+    "clear": "Clear",
+    "ls": "Ls",
+    "mkdir": "Mkdir",
+    "pwd": "Pwd",
+    "rmdir": "Rmdir",
+    "rm": "Rm",
+    "cp": "Cp",
+    "mv": "Mv",
+    "touch": "Touch",
+    "chmod": "Chmod",
+    "cat": "Cat",
+    "grep": "Grep",
+    "sort": "Sort",
+    "head": "Head",
+    "tail": "Tail",
+    "wc": "Wc",
+    "uniq": "Uniq",
+    "perf": "Perf",
+    "find": "Find",
+}
+
+
+def is_command(name: str) -> bool:
+    """
+    Returns True if name is a command, so the shell never runs anything
+    else found on this package, e.g. __dir__.
+    """
+    return name in _commands
+
+
+def __getattr__(name: str):
+    """
+    Imports the module of command name on first use and returns the
+    command. fileSystem is imported the same way.
+    """
+    if name == "fileSystem":
+        return importlib.import_module(f".{name}", __name__)
+
+    if name not in _commands:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    command = getattr(importlib.import_module(f".{_commands[name]}", __name__), name)
+    # Later lookups find it directly, without calling __getattr__
+    globals()[name] = command
+
+    return command
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_commands) | {"fileSystem"})
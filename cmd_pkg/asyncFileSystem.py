@@ -0,0 +1,279 @@
+"""
+Asyncio interface to fileSystem. Every call runs the blocking fileSystem
+function on a bounded pool of worker threads, each with its own sqlite
+connection, so the event loop is never stalled by database I/O.
+
+    from cmd_pkg import asyncFileSystem
+
+    entries = await asyncFileSystem.list_dir("/home")
+    async for chunk in asyncFileSystem.iter_file("/stuff.txt"):
+        ...
+
+Cancelling a call that has not started yet drops it. Cancelling a running
+call interrupts its sqlite statement, and its transaction is rolled back.
+Each call is a transaction of its own. To group several operations, put
+them in a function using fileSystem.transaction() and pass it to run().
+"""
+import asyncio, os, threading
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from . import fileSystem
+from .fileSystem import Entry
+
+_max_workers: int = min(8, (os.cpu_count() or 1) + 4)  # Size of the worker pool
+
+_executor: ThreadPoolExecutor | None = None  # Created on first use, see _get_executor()
+
+_executor_lock: threading.Lock = threading.Lock()
+
+_read_size: int = 64 * 1024  # Bytes per step of iter_file()
+
+
+class _Call:
+    """
+    State shared between a call waiting in the event loop and the worker
+    running it, so that cancelling the call can interrupt the worker.
+    """
+
+    def __init__(self) -> None:
+        self.lock: threading.Lock = threading.Lock()
+        self.conn = None  # Connection of the worker while the call runs
+        self.cancelled: bool = False
+
+    def run(self, func: Callable, args: tuple, kwargs: dict):
+        """
+        Runs func on the calling worker thread, unless already cancelled.
+        """
+        with self.lock:
+            if self.cancelled:
+                raise asyncio.CancelledError()
+            self.conn = fileSystem._get_connection()
+
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self.lock:
+                self.conn = None
+
+    def cancel(self) -> None:
+        """
+        Marks the call cancelled and interrupts its statement if running.
+        """
+        with self.lock:
+            self.cancelled = True
+
+            if self.conn is not None:
+                self.conn.interrupt()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """
+    Returns the worker pool, creating it on first use.
+    """
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=_max_workers, thread_name_prefix="asyncFileSystem"
+            )
+
+        return _executor
+
+
+def set_max_workers(count: int) -> None:
+    """
+    Sets the number of worker threads, and so of concurrent calls and of
+    connections. Takes effect for calls made after the current pool, if
+    any, has finished its work.
+    """
+    global _max_workers
+
+    if count < 1:
+        raise ValueError("count must be at least 1")
+
+    _max_workers = count
+    shutdown(wait=False)
+
+
+def shutdown(wait: bool = True) -> None:
+    """
+    Stops the worker pool. A new one is created by the next call. The
+    workers' connections are closed by fileSystem.close().
+    """
+    global _executor
+
+    with _executor_lock:
+        executor, _executor = _executor, None
+
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+async def run(func: Callable, *args, **kwargs):
+    """
+    Runs func(*args, **kwargs) on a worker thread and returns its result.
+    Use it for anything without an async version here, e.g. a function
+    grouping several operations in fileSystem.transaction().
+    """
+    call: _Call = _Call()
+    loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+    future: asyncio.Future = loop.run_in_executor(
+        _get_executor(), call.run, func, args, kwargs
+    )
+
+    try:
+        return await future
+    except asyncio.CancelledError:
+        call.cancel()
+        raise
+
+
+async def stats(path: str) -> Entry:
+    """
+    See fileSystem.stats().
+    """
+    return await run(fileSystem.stats, path)
+
+
+async def stats_many(paths: list[str]) -> list[Entry | OSError]:
+    """
+    See fileSystem.stats_many().
+    """
+    return await run(fileSystem.stats_many, paths)
+
+
+async def exists_many(paths: list[str]) -> list[bool]:
+    """
+    See fileSystem.exists_many().
+    """
+    return await run(fileSystem.exists_many, paths)
+
+
+async def path_exists(path: str) -> bool:
+    """
+    See fileSystem.path_exists().
+    """
+    return await run(fileSystem.path_exists, path)
+
+
+async def is_dir(path: str) -> bool:
+    """
+    See fileSystem.is_dir().
+    """
+    return await run(fileSystem.is_dir, path)
+
+
+async def is_file(path: str) -> bool:
+    """
+    See fileSystem.is_file().
+    """
+    return await run(fileSystem.is_file, path)
+
+
+async def list_dir(path: str, columns: list[str] | None = None) -> list[Entry]:
+    """
+    See fileSystem.list_dir().
+    """
+    return await run(fileSystem.list_dir, path, columns)
+
+
+async def walk(top: str) -> list[tuple[str, list[str], list[str]]]:
+    """
+    See fileSystem.walk(). The whole tree is read by one call and returned
+    as a list, since the query cannot be moved between workers.
+    """
+    return await run(lambda: list(fileSystem.walk(top)))
+
+
+async def make_dir(path: str) -> None:
+    """
+    See fileSystem.make_dir().
+    """
+    return await run(fileSystem.make_dir, path)
+
+
+async def touch(path: str) -> None:
+    """
+    See fileSystem.touch().
+    """
+    return await run(fileSystem.touch, path)
+
+
+async def chmod(path: str, mode: int) -> None:
+    """
+    See fileSystem.chmod().
+    """
+    return await run(fileSystem.chmod, path, mode)
+
+
+async def move(src: str, dest: str) -> None:
+    """
+    See fileSystem.move().
+    """
+    return await run(fileSystem.move, src, dest)
+
+
+async def copy_file(src: str, dest: str) -> None:
+    """
+    See fileSystem.copy_file().
+    """
+    return await run(fileSystem.copy_file, src, dest)
+
+
+async def remove(path: str) -> None:
+    """
+    See fileSystem.remove().
+    """
+    return await run(fileSystem.remove, path)
+
+
+async def remove_dir(path: str) -> None:
+    """
+    See fileSystem.remove_dir().
+    """
+    return await run(fileSystem.remove_dir, path)
+
+
+async def remove_tree(path: str) -> int:
+    """
+    See fileSystem.remove_tree().
+    """
+    return await run(fileSystem.remove_tree, path)
+
+
+async def read_file(path: str) -> bytes:
+    """
+    See fileSystem.read_file().
+    """
+    return await run(fileSystem.read_file, path)
+
+
+async def write_file(path: str, data: bytes | str) -> None:
+    """
+    See fileSystem.write_file().
+    """
+    return await run(fileSystem.write_file, path, data)
+
+
+def _read_range(path: str, offset: int, size: int) -> bytes:
+    """
+    Reads size bytes at offset of a file, on whichever worker runs it.
+    """
+    with fileSystem.open_file(path) as file:
+        file.seek(offset)
+        return file.read(size)
+
+
+async def iter_file(path: str, size: int = _read_size) -> AsyncIterator[bytes]:
+    """
+    Streams the content of a file in parts of up to size bytes. Each part
+    is read by a separate call, so only one part is in memory at a time
+    and other calls can run in between.
+    """
+    offset: int = 0
+
+    while data := await run(_read_range, path, offset, size):
+        yield data
+        offset += len(data)
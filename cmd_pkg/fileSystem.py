@@ -1,6 +1,8 @@
-import sqlite3, os, csv, errno, stat
-from pypika import Table, Query, Field, Column, Order
+import sqlite3, os, csv, errno, stat, threading, json, itertools, time, hashlib, io
+import contextlib, random
 import datetime
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
 
 _db_path: str = (
     "filesystem.sqlite"  # Global var for keeping track of path to database file
@@ -21,8 +23,59 @@ _columns_info: list[tuple[str, str]] = [  # Global var for keeping track of colu
     ("content", "BLOB"),
 ]
 
+_find_conditions: dict[str, str] = {  # Filter of find() -> condition, in order
+    "name": "file_name GLOB ?",
+    "file_type": "file_type = ?",
+    "min_size": "file_size >= ?",
+    "max_size": "file_size <= ?",
+    "newer_than": "modification_time > ?",
+    "older_than": "modification_time < ?",
+    "perm": "substr(permissions, 2) GLOB ?",
+}
+
+_chunk_size: int = 64 * 1024  # Bytes per chunk of file content
+
+_import_chunk_size: int = 10000  # Rows per executemany batch in csv_to_table
+
+_statements: dict = {}  # Table name -> _Statements, see _sql()
+
+_schema_version: int = 3  # Stamped in PRAGMA user_version, see _migrate()
+
 _cwd: str = "/"  # Global var for keeping track of current working directory
 
+_pragmas: list[str] = [  # Applied once to every connection when it is opened
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -16000",
+]
+
+_busy_timeout: float = 5.0  # Seconds sqlite waits for a lock before SQLITE_BUSY
+
+_busy_retries: int = 0  # Retries after SQLITE_BUSY, see enable_concurrency()
+
+_backoff: tuple[float, float] = (0.01, 1.0)  # First and max retry delay in seconds
+
+_concurrent: bool = False  # Whether other processes may share the database
+
+_local: threading.local = threading.local()  # Each thread's connection and transaction
+
+_connections: list[sqlite3.Connection] = []  # Every open connection, for close()
+
+_connections_lock: threading.Lock = threading.Lock()
+
+_generation: int = 0  # Bumped by close() so threads drop their stale connection
+
+_dentry_cache_size: int = 4096  # Max number of paths kept in the dentry cache
+
+_dentry_cache: OrderedDict = OrderedDict()  # abs path -> (id, pid, file_type) or None
+
+_dentry_lock: threading.Lock = threading.Lock()
+
+_dentry_generation: int = 0  # Bumped whenever entries are dropped, see _lookup()
+
+_dentry_hits: int = 0  # Lookups answered by the dentry cache
+
+_dentry_misses: int = 0  # Lookups that had to query the database
+
 
 class Entry:
     def __init__(self, record: tuple | None = None) -> None:
@@ -78,6 +131,19 @@ class Entry:
         return str(self)
 
 
+def _entry_from_columns(columns: list[str], record: tuple) -> Entry:
+    """
+    Creates Entry from the values of the given columns. Other attributes
+    are left as None.
+    """
+    entry: Entry = Entry()
+
+    for key, value in zip(columns, record):
+        setattr(entry, key, value)
+
+    return entry
+
+
 def _throw_OSError(path: str, path2: str = None):
     """
     Raises OSError with given path(s).
@@ -135,11 +201,368 @@ def path_split(path: str) -> list[str]:
     return parts[::-1]  # Reverse the list
 
 
+def _open_connection() -> sqlite3.Connection:
+    """
+    Opens a new connection to the database and applies the pragmas.
+    """
+    conn: sqlite3.Connection = sqlite3.connect(
+        _db_path, timeout=_busy_timeout, check_same_thread=False
+    )
+
+    for pragma in _pragmas:
+        conn.execute(pragma)
+
+    _migrate(conn)
+
+    with _connections_lock:
+        _connections.append(conn)
+
+    return conn
+
+
+def _is_busy(error: sqlite3.Error) -> bool:
+    """
+    Returns True if error means the database was locked by another
+    connection, so the operation can be retried.
+    """
+    code: int = getattr(error, "sqlite_errorcode", 0) & 0xFF
+
+    return code in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+
+
+def _retry(operation: Callable, *args):
+    """
+    Runs operation with args and returns its result. While the database is
+    busy, retries up to _busy_retries times with exponential backoff.
+    """
+    first, most = _backoff
+
+    for attempt in itertools.count():
+        try:
+            return operation(*args)
+        except sqlite3.OperationalError as e:
+            if attempt >= _busy_retries or not _is_busy(e):
+                raise
+
+            time.sleep(min(first * 2**attempt, most) * random.uniform(0.5, 1.0))
+
+
+def _begin(conn: sqlite3.Connection) -> None:
+    """
+    Starts a write transaction on conn unless one is already open. Takes
+    the write lock up front rather than upgrading to it midway, which is
+    where concurrent writers fail without waiting.
+    """
+    if not conn.in_transaction:
+        _retry(conn.execute, "BEGIN IMMEDIATE")
+        _local.dentries = None  # See _transaction_dentries()
+
+
+def _create_tables(cursor: sqlite3.Cursor, table_name: str) -> None:
+    """
+    Creates the table and its content store tables, if they do not
+    already exist.
+    """
+    statements: _Statements = _sql(table_name)
+
+    cursor.execute(statements.create_table)
+    cursor.execute(statements.create_content_table)
+    cursor.execute(statements.create_data_table)
+    cursor.execute(statements.create_meta_table)
+
+
+def _create_indexes(cursor: sqlite3.Cursor, table_name: str) -> None:
+    """
+    Creates the indexes of the table, if they do not already exist. The
+    unique index on (pid, file_name) backs every path lookup and, through
+    its leading pid column, every directory listing.
+    """
+    cursor.execute(
+        f'CREATE UNIQUE INDEX IF NOT EXISTS "{table_name}_pid_file_name" '
+        f'ON "{table_name}" (pid, file_name)'
+    )
+    cursor.execute(
+        f'CREATE INDEX IF NOT EXISTS "{table_name}_data_hash" '
+        f'ON "{table_name}_data" (hash)'
+    )
+    cursor.execute(
+        f'CREATE INDEX IF NOT EXISTS "{table_name}_content_garbage" '
+        f'ON "{table_name}_content" (hash) WHERE refcount <= 0'
+    )
+
+
+def _create_triggers(cursor: sqlite3.Cursor, table_name: str) -> None:
+    """
+    Creates the triggers that keep the refcount of the content store in
+    step with the files pointing at it, if they do not already exist.
+    """
+    for trigger in _sql(table_name).create_triggers:
+        cursor.execute(trigger)
+
+
+def _collect_garbage(cursor: sqlite3.Cursor) -> None:
+    """
+    Deletes content no file references anymore. Uses a partial index, so
+    the cost depends on the amount of garbage, not the size of the store.
+    """
+    cursor.execute(_sql().delete_garbage)
+
+
+def _store_content(cursor: sqlite3.Cursor, data: bytes) -> str:
+    """
+    Adds a chunk to the content store, unless an identical chunk is already
+    there, and returns its hash. The refcount is raised by the triggers
+    once a file points at the hash.
+    """
+    content_hash: str = hashlib.sha256(data).hexdigest()
+    cursor.execute(_sql().insert_content, (content_hash, len(data), data))
+
+    return content_hash
+
+
+def _store_contents(
+    cursor: sqlite3.Cursor, contents: list[tuple], table_name: str | None = None
+) -> None:
+    """
+    Adds (hash, size, chunk) rows to the content store in one batch, like
+    _store_content().
+    """
+    cursor.executemany(_sql(table_name).insert_content, contents)
+
+
+def _insert_chunks(cursor: sqlite3.Cursor, file_id: int, data: bytes) -> None:
+    """
+    Stores data as the content of a file without content, one chunk of
+    _chunk_size bytes at a time.
+    """
+    for seq, start in enumerate(range(0, len(data), _chunk_size)):
+        content_hash: str = _store_content(cursor, data[start : start + _chunk_size])
+        cursor.execute(_sql().insert_data, (file_id, seq, content_hash))
+
+
+def _as_bytes(content: bytes | str | int | float) -> bytes:
+    """
+    Converts content as stored by older versions or read from CSV to bytes.
+    """
+    if isinstance(content, bytes):
+        return content
+
+    return str(content).encode()
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    """
+    Upgrades the table of a database created by an older version of this
+    module in place, then stamps the database with the current
+    _schema_version. Does nothing if the table does not exist yet.
+    """
+    cursor: sqlite3.Cursor = conn.cursor()
+    version: int = cursor.execute("PRAGMA user_version").fetchone()[0]
+
+    if version >= _schema_version:
+        return
+
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (_table_name,),
+    )
+    if not cursor.fetchone():
+        return
+
+    try:
+        # Version 1: unique (pid, file_name). Older files could hold
+        # duplicate names in a directory, so rename all but the first.
+        if version < 1:
+            cursor.execute(
+                f"""
+                UPDATE "{_table_name}" SET file_name = file_name || '~' || id
+                WHERE id NOT IN (
+                    SELECT MIN(id) FROM "{_table_name}" GROUP BY pid, file_name
+                )
+                """
+            )
+
+        content: str = f"{_table_name}_content"
+        data: str = f"{_table_name}_data"
+
+        # Version 3: content is stored in chunks, so the data table gains a
+        # seq column. Set the version 2 table aside, it is converted below.
+        if version == 2:
+            for trigger in ("_release", "_data_ref", "_data_unref", "_data_reref"):
+                cursor.execute(f'DROP TRIGGER IF EXISTS "{_table_name}{trigger}"')
+            cursor.execute(f'DROP INDEX IF EXISTS "{_table_name}_data_hash"')
+            cursor.execute(f'ALTER TABLE "{data}" RENAME TO "{data}_v2"')
+
+        _create_tables(cursor, _table_name)
+        _create_indexes(cursor, _table_name)
+
+        # Version 2: file content moves from the content column into the
+        # content store.
+        if version < 2:
+            rows: list[tuple] = cursor.execute(
+                f"""
+                SELECT id, content FROM "{_table_name}"
+                WHERE file_type = 'file' AND content IS NOT NULL AND content != ''
+                """
+            ).fetchall()
+
+            for entry_id, blob in rows:
+                _insert_chunks(cursor, entry_id, _as_bytes(blob))
+
+            cursor.execute(f'UPDATE "{_table_name}" SET content = NULL')
+
+        if version == 2:
+            rows: list[tuple] = cursor.execute(
+                f"""
+                SELECT d.file_id, c.data FROM "{data}_v2" AS d
+                JOIN "{content}" AS c ON c.hash = d.hash
+                """
+            ).fetchall()
+
+            for entry_id, blob in rows:
+                _insert_chunks(cursor, entry_id, blob)
+
+            cursor.execute(f'DROP TABLE "{data}_v2"')
+
+        # Whole-file content that was split into chunks is now unreferenced
+        if version < 3:
+            cursor.execute(_sql().recount_content)
+            _collect_garbage(cursor)
+
+        _create_triggers(cursor, _table_name)
+
+        cursor.execute(f"PRAGMA user_version = {_schema_version}")
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"Error: {e}")
+        conn.rollback()
+
+
+def _get_connection() -> sqlite3.Connection:
+    """
+    Returns the connection owned by the calling thread, opening it on first
+    use. Every operation in this module goes through here, so each thread
+    keeps a single configured connection until close() is called.
+    """
+    conn: sqlite3.Connection | None = getattr(_local, "conn", None)
+
+    if conn is None or _local.generation != _generation:
+        conn = _open_connection()
+        _local.conn = conn
+        _local.generation = _generation
+
+    return conn
+
+
+def close() -> None:
+    """
+    Commits and closes every open connection to the database. Connections
+    are reopened on demand by the next operation.
+    """
+    global _generation
+
+    with _connections_lock:
+        _generation += 1
+
+        while _connections:
+            conn: sqlite3.Connection = _connections.pop()
+            try:
+                conn.commit()
+                conn.close()
+            except sqlite3.Error as e:
+                print(f"Error: {e}")
+
+
+@contextlib.contextmanager
+def transaction() -> Iterator[sqlite3.Connection]:
+    """
+    Runs the operations in the block as one transaction, committed when it
+    exits and rolled back if it raises, as operations in it do on sqlite
+    errors. Nested blocks are savepoints.
+    """
+    conn: sqlite3.Connection = _get_connection()
+    depth: int = getattr(_local, "depth", 0)
+    savepoint: str = f"nested_{depth}"
+
+    if depth:
+        conn.execute(f"SAVEPOINT {savepoint}")
+    else:
+        _begin(conn)
+
+    _local.depth = depth + 1
+
+    try:
+        yield conn
+
+        if depth:
+            conn.execute(f"RELEASE {savepoint}")
+        else:
+            generation: int = _dentry_generation
+            _retry(conn.commit)
+            _publish_dentries(generation)
+    except BaseException:
+        # sqlite may already have rolled back everything on some errors
+        if conn.in_transaction:
+            if depth:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+            else:
+                conn.rollback()
+
+        # Paths resolved in the transaction may have been undone
+        if depth and conn.in_transaction:
+            _transaction_dentries().clear()
+        else:
+            _local.dentries = None
+        raise
+    finally:
+        _local.depth = depth
+
+
+def _report_error(error: sqlite3.Error) -> None:
+    """
+    Prints an error of sqlite caught by an operation. Within a transaction()
+    block, raises it instead, so that the whole block is rolled back.
+    """
+    if getattr(_local, "depth", 0):
+        raise error
+
+    print(f"Error: {error}")
+
+
+def enable_concurrency(
+    busy_timeout: float = 5.0,
+    retries: int = 8,
+    backoff: tuple[float, float] = (0.01, 1.0),
+) -> None:
+    """
+    Lets other processes share the database: switches it to WAL, waits up
+    to busy_timeout seconds for locks and retries up to retries times.
+    """
+    global _busy_timeout, _busy_retries, _backoff, _concurrent
+
+    _busy_timeout = busy_timeout
+    _busy_retries = retries
+    _backoff = backoff
+    _concurrent = True
+
+    for pragma in ("PRAGMA journal_mode = WAL", "PRAGMA synchronous = NORMAL"):
+        if pragma not in _pragmas:
+            _pragmas.append(pragma)
+
+    close()
+    clear_dentry_cache()
+
+
 def set_db_path(path: str) -> None:
     """
-    Set path to database file.
+    Set path to database file. Closes connections to the previous file.
     """
     global _db_path
+
+    if path != _db_path:
+        close()
+        clear_dentry_cache()
     _db_path = path
 
 
@@ -156,6 +579,7 @@ def set_table_name(table_name: str) -> None:
     """
     global _table_name
     _table_name = table_name
+    clear_dentry_cache()
 
 
 def get_table_name() -> str:
@@ -196,6 +620,347 @@ def set_cwd(path: str) -> None:
         _cwd = path
 
 
+def _column_list(columns: list[str]) -> str:
+    """
+    Returns the quoted column names separated by commas, for a SELECT.
+    """
+    return ",".join(f'"{column}"' for column in columns)
+
+
+class _Statements:
+    """
+    Catalog of parameterized SQL statements for one table. Built once per
+    table name by _sql(), so every call runs the same SQL text with "?"
+    placeholders and hits sqlite's statement cache.
+    """
+
+    def __init__(self, table_name: str) -> None:
+        table: str = f'"{table_name}"'
+
+        self._table: str = table
+        self._table_name: str = table_name
+        self._projections: dict[tuple, str] = {}  # See select_children_columns()
+        self._walks: dict[tuple, str] = {}  # See walk_columns()
+        self._finds: dict[tuple, str] = {}  # See find_filters()
+
+        self.create_table: str = (
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            + ",".join(f'"{name}" {kind}' for name, kind in _columns_info)
+            + ")"
+        )
+        self.drop_table: str = f"DROP TABLE IF EXISTS {table}"
+        self.insert: str = (
+            f"INSERT INTO {table} VALUES ({','.join('?' * len(_columns_info))})"
+        )
+        # Every column but the legacy content column, so entries are
+        # read without any file content
+        metadata: list[str] = [name for name, _ in _columns_info if name != "content"]
+        self.metadata_columns: list[str] = metadata
+
+        self.select_by_id: str = (
+            f'SELECT {_column_list(metadata)} FROM {table} WHERE "id"=?'
+        )
+        self.select_children: str = (
+            f'SELECT {_column_list(metadata)} FROM {table} WHERE "pid"=?'
+        )
+        self.update_permissions: str = f'UPDATE {table} SET "permissions"=? WHERE "id"=?'
+        self.update_mtime: str = (
+            f'UPDATE {table} SET "modification_time"=? WHERE "id"=?'
+        )
+        self.update_location: str = (
+            f'UPDATE {table} SET "pid"=?,"file_name"=?,"modification_time"=? '
+            'WHERE "id"=?'
+        )
+        self.delete_by_id: str = f'DELETE FROM {table} WHERE "id"=?'
+        self.update_size_mtime: str = (
+            f'UPDATE {table} SET "file_size"=?,"modification_time"=? WHERE "id"=?'
+        )
+
+        # Content store: one row per distinct chunk of content, keyed by its
+        # sha256, and one row per chunk of each file pointing at its content.
+        content: str = f"{table_name}_content"
+        data: str = f"{table_name}_data"
+
+        self.create_content_table: str = f"""
+            CREATE TABLE IF NOT EXISTS "{content}" (
+                hash TEXT PRIMARY KEY,
+                refcount INTEGER NOT NULL DEFAULT 0,
+                size INTEGER NOT NULL,
+                data BLOB NOT NULL
+            )
+        """
+        self.create_data_table: str = f"""
+            CREATE TABLE IF NOT EXISTS "{data}" (
+                file_id INTEGER NOT NULL,
+                seq INTEGER NOT NULL,
+                hash TEXT NOT NULL,
+                PRIMARY KEY (file_id, seq)
+            ) WITHOUT ROWID
+        """
+        self.drop_content_table: str = f'DROP TABLE IF EXISTS "{content}"'
+
+        # Settings of the table as key/value pairs, e.g. the fingerprint of
+        # the CSV file it was loaded from. Kept when the table is reloaded.
+        meta: str = f"{table_name}_meta"
+
+        self.create_meta_table: str = f"""
+            CREATE TABLE IF NOT EXISTS "{meta}" (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+        """
+        self.drop_meta_table: str = f'DROP TABLE IF EXISTS "{meta}"'
+        self.select_meta: str = f'SELECT value FROM "{meta}" WHERE key = ?'
+        self.upsert_meta: str = f"""
+            INSERT INTO "{meta}" (key, value) VALUES (?, ?)
+            ON CONFLICT (key) DO UPDATE SET value = excluded.value
+        """
+        self.drop_data_table: str = f'DROP TABLE IF EXISTS "{data}"'
+        self.insert_content: str = (
+            f'INSERT OR IGNORE INTO "{content}" (hash, size, data) VALUES (?, ?, ?)'
+        )
+        self.insert_data: str = (
+            f'INSERT INTO "{data}" (file_id, seq, hash) VALUES (?, ?, ?)'
+        )
+        self.upsert_data: str = (
+            f'INSERT INTO "{data}" (file_id, seq, hash) VALUES (?, ?, ?) '
+            f"ON CONFLICT (file_id, seq) DO UPDATE SET hash = excluded.hash"
+        )
+        self.copy_data: str = (
+            f'INSERT INTO "{data}" (file_id, seq, hash) '
+            f'SELECT ?, seq, hash FROM "{data}" WHERE file_id = ?'
+        )
+        self.delete_data_from: str = (
+            f'DELETE FROM "{data}" WHERE file_id = ? AND seq >= ?'
+        )
+        self.select_chunks: str = f"""
+            SELECT d.seq, c.data FROM "{data}" AS d
+            JOIN "{content}" AS c ON c.hash = d.hash
+            WHERE d.file_id = ? AND d.seq BETWEEN ? AND ?
+            ORDER BY d.seq
+        """
+        self.select_data_size: str = f"""
+            SELECT COALESCE(SUM(c.size), 0) FROM "{data}" AS d
+            JOIN "{content}" AS c ON c.hash = d.hash
+            WHERE d.file_id = ?
+        """
+        self.recount_content: str = f"""
+            UPDATE "{content}" SET refcount = (
+                SELECT COUNT(*) FROM "{data}" AS d WHERE d.hash = "{content}".hash
+            )
+        """
+        self.delete_garbage: str = f'DELETE FROM "{content}" WHERE refcount <= 0'
+        self.dedup_report: str = f"""
+            SELECT COALESCE(SUM(size * refcount), 0), COALESCE(SUM(size), 0)
+            FROM "{content}"
+        """
+
+        self.create_triggers: list[str] = [
+            f"""
+            CREATE TRIGGER IF NOT EXISTS "{table_name}_release"
+            AFTER DELETE ON "{table_name}"
+            BEGIN
+                DELETE FROM "{data}" WHERE file_id = OLD.id;
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS "{data}_ref"
+            AFTER INSERT ON "{data}"
+            BEGIN
+                UPDATE "{content}" SET refcount = refcount + 1 WHERE hash = NEW.hash;
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS "{data}_unref"
+            AFTER DELETE ON "{data}"
+            BEGIN
+                UPDATE "{content}" SET refcount = refcount - 1 WHERE hash = OLD.hash;
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS "{data}_reref"
+            AFTER UPDATE OF hash ON "{data}" WHEN OLD.hash <> NEW.hash
+            BEGIN
+                UPDATE "{content}" SET refcount = refcount + 1 WHERE hash = NEW.hash;
+                UPDATE "{content}" SET refcount = refcount - 1 WHERE hash = OLD.hash;
+            END
+            """,
+        ]
+
+        self.delete_subtree: str = f"""
+            WITH RECURSIVE subtree(id) AS (
+                SELECT ?
+                UNION ALL
+                SELECT t.id FROM "{table_name}" AS t
+                JOIN subtree ON t.pid = subtree.id
+            )
+            DELETE FROM "{table_name}" WHERE id IN (SELECT id FROM subtree)
+        """
+        # CROSS JOIN keeps the tables in this order, so each step is a
+        # single seek on (pid, file_name) rather than a scan of the children
+        self.resolve: str = f"""
+            WITH RECURSIVE
+                parts(depth, name) AS (
+                    SELECT key + 1, value FROM json_each(?)
+                ),
+                walk(depth, id, pid, file_type) AS (
+                    SELECT 0, 0, NULL, 'directory'
+                    UNION ALL
+                    SELECT parts.depth, t.id, t.pid, t.file_type
+                    FROM walk
+                    CROSS JOIN parts ON parts.depth = walk.depth + 1
+                    CROSS JOIN "{table_name}" AS t
+                        ON t.pid = walk.id AND t.file_name = parts.name
+                )
+            SELECT id, pid, file_type, depth FROM walk
+            ORDER BY depth DESC LIMIT 1
+        """
+        # Resolves many paths at once. The parameter is a trie of their
+        # components as a JSON list of [node, parent node, name], node 0
+        # being root, so a shared prefix is only walked once. The trie is
+        # decoded once, and each step seeks (pid, file_name) as in resolve.
+        resolve_trie: str = f"""
+            WITH RECURSIVE
+                nodes(node, parent, name) AS MATERIALIZED (
+                    SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]'),
+                        json_extract(value, '$[2]')
+                    FROM json_each(?)
+                ),
+                found(node, id) AS (
+                    SELECT 0, 0
+                    UNION ALL
+                    SELECT nodes.node, t.id
+                    FROM found
+                    CROSS JOIN nodes ON nodes.parent = found.node
+                    CROSS JOIN "{table_name}" AS t
+                        ON t.pid = found.id AND t.file_name = nodes.name
+                )
+        """
+        self.resolve_many: str = f"""{resolve_trie}
+            SELECT found.node, found.id, t.pid, coalesce(t.file_type, 'directory')
+            FROM found LEFT JOIN "{table_name}" AS t ON t.id = found.id
+        """
+        self.stats_many: str = f"""{resolve_trie}
+            SELECT found.node, {", ".join(f't."{c}"' for c in metadata)}
+            FROM found LEFT JOIN "{table_name}" AS t ON t.id = found.id
+        """
+
+    def select_children_columns(self, columns: list[str]) -> str:
+        """
+        Returns the statement listing the given columns of the children of
+        a directory, building it on first use. Raises ValueError for a
+        column that is not a metadata column.
+        """
+        key: tuple = tuple(columns)
+        statement: str | None = self._projections.get(key)
+
+        if statement is None:
+            unknown: set[str] = set(columns).difference(self.metadata_columns)
+
+            if unknown:
+                raise ValueError(f"unknown column(s): {', '.join(sorted(unknown))}")
+
+            statement = self._projections[key] = (
+                f'SELECT {_column_list(columns)} FROM {self._table} WHERE "pid"=?'
+            )
+
+        return statement
+
+    def walk_columns(self, columns: list[str]) -> str:
+        """
+        Returns the statement walking a directory tree, ordered by path: a
+        row (path, 0, NULL, ...) per directory, then (path, 1, *columns) per
+        child. columns must start with "file_name" and "file_type".
+        """
+        key: tuple = tuple(columns)
+        statement: str | None = self._walks.get(key)
+
+        if statement is None:
+            unknown: set[str] = set(columns).difference(self.metadata_columns)
+
+            if unknown:
+                raise ValueError(f"unknown column(s): {', '.join(sorted(unknown))}")
+
+            table_name: str = self._table_name
+            nulls: str = ", ".join(["NULL"] * len(columns))
+            names: str = _column_list(columns)
+            selected: str = ", ".join(f't."{column}"' for column in columns)
+
+            # The queue is taken in _key order, so rows stream out sorted. A
+            # join on tree would lose the order, so the children's columns
+            # are carried through it, next to columns starting with "_".
+            statement = self._walks[key] = f"""
+                WITH RECURSIVE tree(_kind, _id, _path, _parent, _key, {names}) AS (
+                    SELECT 0, ?1, ?2, NULL, ?2 || char(1), {nulls}
+                    UNION ALL
+                    SELECT 1, t.id, tree._path || '/' || t.file_name, tree._path,
+                        tree._path || char(1, 1) || t.file_name, {selected}
+                    FROM "{table_name}" AS t
+                    JOIN tree ON t.pid = tree._id
+                    WHERE tree._kind = 0
+                    UNION ALL
+                    SELECT 0, _id, _path, NULL, _path || char(1), {nulls}
+                    FROM tree
+                    WHERE _kind = 1 AND file_type = 'directory'
+                    ORDER BY 5
+                )
+                SELECT coalesce(_parent, _path), _kind, {names} FROM tree
+            """
+
+        return statement
+
+    def find_filters(self, filters: tuple[str, ...], maxdepth: bool) -> str:
+        """
+        Returns the statement finding the paths in a directory tree that
+        match filters, keys of _find_conditions in the same order.
+        """
+        key: tuple = (filters, maxdepth)
+        statement: str | None = self._finds.get(key)
+
+        if statement is None:
+            table_name: str = self._table_name
+            limit: str = " AND tree.depth < ?" if maxdepth else ""
+            conditions: str = "".join(
+                f" AND {_find_conditions[name]}" for name in filters
+            )
+
+            # Root has no row of its own, so the top is left joined
+            statement = self._finds[key] = f"""
+                WITH RECURSIVE tree(id, path, depth, file_name, file_type,
+                    file_size, permissions, modification_time) AS (
+                    SELECT top.id, top.path, 0, t.file_name,
+                        coalesce(t.file_type, 'directory'), t.file_size,
+                        t.permissions, t.modification_time
+                    FROM (SELECT ? AS id, ? AS path) AS top
+                    LEFT JOIN "{table_name}" AS t ON t.id = top.id
+                    UNION ALL
+                    SELECT t.id, tree.path || '/' || t.file_name, tree.depth + 1,
+                        t.file_name, t.file_type, t.file_size, t.permissions,
+                        t.modification_time
+                    FROM "{table_name}" AS t
+                    JOIN tree ON t.pid = tree.id
+                    WHERE tree.file_type = 'directory'{limit}
+                )
+                SELECT path FROM tree WHERE depth >= ?{conditions}
+            """
+
+        return statement
+
+
+def _sql(table_name: str | None = None) -> _Statements:
+    """
+    Returns the statement catalog of a table, building it on first use.
+    If table_name is not passed in, uses _table_name.
+    """
+    table_name = table_name if table_name else _table_name
+    statements: _Statements | None = _statements.get(table_name)
+
+    if statements is None:
+        statements = _statements[table_name] = _Statements(table_name)
+
+    return statements
+
+
 def create_table(
     table_name: str | None = None,
 ) -> bool:
@@ -206,25 +971,20 @@ def create_table(
         table_name (str): Name of the table.
     """
     table_name = table_name if table_name else _table_name
-    conn: sqlite3.Connection = sqlite3.connect(_db_path)
-    cursor: sqlite3.Cursor = conn.cursor()
 
     try:
-        # Create a table with the given columns, if not already existing
-        query: str = (
-            Query.create_table(table_name)
-            .columns(*_columns_info)
-            .if_not_exists()
-            .get_sql()
-        )
-        cursor.execute(query)
-        conn.commit()
+        with transaction() as conn:
+            cursor: sqlite3.Cursor = conn.cursor()
+
+            # Create a table with the given columns, if not already existing
+            _create_tables(cursor, table_name)
+            _create_indexes(cursor, table_name)
+            _create_triggers(cursor, table_name)
+            cursor.execute(f"PRAGMA user_version = {_schema_version}")
         return True
     except sqlite3.Error as e:
-        print(f"Error: {e}")
+        _report_error(e)
         return False
-    finally:
-        conn.close()
 
 
 def drop_table(table_name: str | None = None) -> None:
@@ -238,163 +998,550 @@ def drop_table(table_name: str | None = None) -> None:
 
     table_name = table_name if table_name else _table_name
 
-    conn: sqlite3.Connection = sqlite3.connect(_db_path)
-    cursor: sqlite3.Cursor = conn.cursor()
-
     try:
-        # Create a table with the given columns
-        query: str = Query.drop_table(table_name).if_exists().get_sql()
-        cursor.execute(query)
-        conn.commit()
+        statements: _Statements = _sql(table_name)
+
+        with transaction() as conn:
+            cursor: sqlite3.Cursor = conn.cursor()
+            cursor.execute(statements.drop_table)
+            cursor.execute(statements.drop_data_table)
+            cursor.execute(statements.drop_content_table)
+            cursor.execute(statements.drop_meta_table)
+        clear_dentry_cache()
         return True
     except sqlite3.Error as e:
-        print(f"Error: {e}")
+        _report_error(e)
         return False
+
+
+def csv_to_table(
+    file_name: str,
+    table_name: str | None = None,
+    progress: Callable[[int], None] | None = None,
+) -> dict[str, float]:
+    """
+    Put data from CSV into database table, replacing it in one transaction.
+    Calls progress with the number of rows loaded after each chunk. Returns
+    the number of rows, seconds taken and rows per second.
+    """
+    table_name = table_name if table_name else _table_name
+    statements: _Statements = _sql(table_name)
+    conn: sqlite3.Connection = _get_connection()
+    cursor: sqlite3.Cursor = conn.cursor()
+    rows: int = 0
+    start: float = time.perf_counter()
+
+    # Nothing is lost if the import is interrupted, it can just be rerun,
+    # so skip syncing to disk until the load is done.
+    synchronous: int = cursor.execute("PRAGMA synchronous").fetchone()[0]
+    cursor.execute("PRAGMA synchronous = OFF")
+
+    try:
+        fingerprint: dict = _csv_fingerprint(file_name)
+
+        with open(file_name, newline="") as file, transaction():
+            data = csv.reader(file)
+
+            cursor.execute(statements.drop_table)
+            cursor.execute(statements.drop_data_table)
+            cursor.execute(statements.drop_content_table)
+            _create_tables(cursor, table_name)
+
+            while chunk := list(itertools.islice(data, _import_chunk_size)):
+                contents: list[tuple] = []
+                refs: list[tuple] = []
+
+                # Last column is the content, which is moved to the store
+                for record in chunk:
+                    content: str = record[-1]
+                    record[-1] = None
+
+                    if record[3] != "file" or not content:
+                        continue
+
+                    blob: bytes = _as_bytes(content)
+
+                    for seq, offset in enumerate(range(0, len(blob), _chunk_size)):
+                        piece: bytes = blob[offset : offset + _chunk_size]
+                        content_hash: str = hashlib.sha256(piece).hexdigest()
+                        contents.append((content_hash, len(piece), piece))
+                        refs.append((record[0], seq, content_hash))
+
+                cursor.executemany(statements.insert, chunk)
+                _store_contents(cursor, contents, table_name)
+                cursor.executemany(statements.insert_data, refs)
+                rows += len(chunk)
+
+                if progress:
+                    progress(rows)
+
+            _create_indexes(cursor, table_name)
+            cursor.execute(statements.recount_content)
+            _create_triggers(cursor, table_name)
+            cursor.execute(statements.upsert_meta, ("csv", json.dumps(fingerprint)))
+            cursor.execute(f"PRAGMA user_version = {_schema_version}")
+    except sqlite3.Error as e:
+        _report_error(e)
     finally:
-        conn.close()
+        cursor.execute(f"PRAGMA synchronous = {synchronous}")
+        clear_dentry_cache()
+
+    seconds: float = time.perf_counter() - start
+
+    return {
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_second": rows / seconds if seconds else 0.0,
+    }
 
 
-def csv_to_table(file_name: str, table_name: str | None = None) -> None:
+def _csv_fingerprint(file_name: str, digest: bool = True) -> dict:
     """
-    Put data from CSV into database table.
+    Returns the size, modification time and, if digest is True, sha256 of
+    a CSV file, to tell whether it changed since it was loaded.
     """
+    info: os.stat_result = os.stat(file_name)
+    fingerprint: dict = {"size": info.st_size, "mtime_ns": info.st_mtime_ns}
+
+    if digest:
+        sha256 = hashlib.sha256()
+
+        with open(file_name, "rb") as file:
+            while block := file.read(1024 * 1024):
+                sha256.update(block)
+
+        fingerprint["sha256"] = sha256.hexdigest()
 
+    return fingerprint
+
+
+def seed_from_csv(
+    file_name: str, table_name: str | None = None, force: bool = False
+) -> bool:
+    """
+    Loads the table from the CSV file if force is True, the table does not
+    exist yet or the file changed since it was loaded. A table that was not
+    loaded from the file is kept. Returns True if loaded.
+    """
     table_name = table_name if table_name else _table_name
+    statements: _Statements = _sql(table_name)
+    conn: sqlite3.Connection = _get_connection()
+    cursor: sqlite3.Cursor = conn.cursor()
+    tables: set[str] = set()
+    stored: dict | None = None
+
+    try:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN (?, ?)",
+            (table_name, f"{table_name}_meta"),
+        )
+        tables = {name for (name,) in cursor}
+
+        if f"{table_name}_meta" in tables:
+            row: tuple | None = cursor.execute(
+                statements.select_meta, ("csv",)
+            ).fetchone()
+            stored = json.loads(row[0]) if row else None
+    except sqlite3.Error as e:
+        _report_error(e)
+
+    if not force and table_name in tables:
+        # Without a fingerprint, the table predates them or was not loaded
+        # from a file, so only force replaces it
+        if stored is None:
+            return False
+
+        # Keep using the table if the file it came from is gone
+        if not os.path.exists(file_name):
+            return False
+
+        current: dict = _csv_fingerprint(file_name, digest=False)
+
+        if current["size"] == stored["size"]:
+            if current["mtime_ns"] == stored["mtime_ns"]:
+                return False
+
+            current = _csv_fingerprint(file_name)
+
+            # Touched but not changed, remember the new time
+            if current["sha256"] == stored["sha256"]:
+                try:
+                    with transaction():
+                        cursor.execute(
+                            statements.upsert_meta, ("csv", json.dumps(current))
+                        )
+                except sqlite3.Error as e:
+                    _report_error(e)
+                return False
+
+    csv_to_table(file_name, table_name)
+    return True
+
+
+def _resolve(path: str) -> tuple[int, int | None, str, int]:
+    """
+    Resolves a full path in a single query. Returns (id, pid, file_type,
+    depth) of its deepest existing component, depth components below "/".
+    """
+    names: list[str] = path_split(path)[1:]
+    conn: sqlite3.Connection = _get_connection()
+    cursor: sqlite3.Cursor = conn.cursor()
+
+    _retry(cursor.execute, _sql().resolve, (json.dumps(names),))
+
+    return cursor.fetchone()
+
+
+def _validate_dentry_cache() -> None:
+    """
+    With enable_concurrency(), drops the dentry cache if any other
+    connection has committed since the calling thread last checked.
+    PRAGMA data_version only changes on commits by other connections, and
+    costs far less than resolving a path.
+    """
+    if not _concurrent:
+        return
+
+    conn: sqlite3.Connection = _get_connection()
+    version: tuple = (id(conn), conn.execute("PRAGMA data_version").fetchone()[0])
+
+    if getattr(_local, "data_version", None) != version:
+        _local.data_version = version
+        _drop_dentries()
+
+
+def _transaction_dentries() -> OrderedDict | None:
+    """
+    Returns the dentry cache of the calling thread's write transaction, or
+    None outside one. Its paths may be rolled back, so other threads only
+    see them once committed, see _publish_dentries().
+    """
+    if not _get_connection().in_transaction:
+        return None
+
+    private: OrderedDict | None = getattr(_local, "dentries", None)
+
+    if private is None:
+        private = _local.dentries = OrderedDict()
+        _local.dropped = []  # (path, subtree) dropped by the transaction
+
+    return private
+
+
+def _forget_dentries(cache: OrderedDict, path: str, subtree: bool) -> None:
+    """
+    Drops path from cache and, if subtree is True, every path below it.
+    """
+    cache.pop(path, None)
+
+    if subtree:
+        prefix: str = path.rstrip("/") + "/"
+
+        for key in [key for key in cache if key.startswith(prefix)]:
+            del cache[key]
+
+
+def _drop_dentries() -> None:
+    """
+    Empties the dentry cache, keeping its counters.
+    """
+    global _dentry_generation
+
+    with _dentry_lock:
+        _dentry_generation += 1
+        _dentry_cache.clear()
+        private: OrderedDict | None = getattr(_local, "dentries", None)
+
+        if private is not None:
+            private.clear()
+            _local.dropped.append(("/", True))
+
+
+def _cache_dentries(
+    found: dict[str, tuple | None], generation: int, private: OrderedDict | None = None
+) -> None:
+    """
+    Adds resolved paths to the dentry cache, unless entries were dropped
+    since _dentry_generation was read as generation, before resolving.
+    Within a write transaction, adds them to its own cache, private.
+    """
+    with _dentry_lock:
+        if private is None and generation != _dentry_generation:
+            return
+
+        cache: OrderedDict = _dentry_cache if private is None else private
+        cache.update(found)
+
+        for path in found:
+            cache.move_to_end(path)
+
+        while len(cache) > _dentry_cache_size:
+            cache.popitem(last=False)
+
+
+def _publish_dentries(generation: int) -> None:
+    """
+    Once the calling thread's transaction is committed, drops the paths it
+    changed from the dentry cache again, as other threads may have cached
+    them since, and adds the paths it resolved, if nothing else changed.
+    """
+    global _dentry_generation
+
+    private: OrderedDict | None = getattr(_local, "dentries", None)
+    _local.dentries = None
+
+    if private is None:
+        return
+
+    with _dentry_lock:
+        unchanged: bool = generation == _dentry_generation
+
+        if _local.dropped:
+            _dentry_generation += 1
+
+            for path, subtree in _local.dropped:
+                _forget_dentries(_dentry_cache, path, subtree)
+
+        generation = _dentry_generation
+
+    if unchanged:
+        _cache_dentries(private, generation)
+
+
+def _lookup(path: str) -> tuple[int, int | None, str] | None:
+    """
+    Returns (id, pid, file_type) of given path, or None if it does not exist.
+    """
+    global _dentry_hits, _dentry_misses
+
+    path = abs_path(path)
+    _validate_dentry_cache()
+    private: OrderedDict | None = _transaction_dentries()
+    cache: OrderedDict = _dentry_cache if private is None else private
+
+    with _dentry_lock:
+        if path in cache:
+            _dentry_hits += 1
+            cache.move_to_end(path)
+            return cache[path]
+        _dentry_misses += 1
+        generation: int = _dentry_generation
+
+    parts: list[str] = path_split(path)
+
+    if not parts or parts[0] != "/":
+        return None
+
+    try:
+        entry_id, pid, file_type, depth = _resolve(path)
+    except sqlite3.Error as e:
+        _report_error(e)
+        return None
+
+    found: tuple | None = (
+        (entry_id, pid, file_type) if depth == len(parts) - 1 else None
+    )
+    _cache_dentries({path: found}, generation, private)
+
+    return found
+
+
+def _path_trie(paths: list[str]) -> tuple[str, list[int | None]]:
+    """
+    Builds the trie of the components of the given absolute paths, for the
+    resolve_many and stats_many statements. Returns the trie as JSON and
+    the node of each path, or None for a path that can not exist.
+    """
+    children: dict[tuple[int, str], int] = {}
+    trie: list[list] = []
+    path_nodes: list[int | None] = []
+
+    for path in paths:
+        parts: list[str] = path_split(path)
+
+        if not parts or parts[0] != "/":
+            path_nodes.append(None)
+            continue
+
+        node: int = 0
+
+        for name in parts[1:]:
+            child: int | None = children.get((node, name))
+
+            if child is None:
+                child = children[(node, name)] = len(trie) + 1
+                trie.append([child, node, name])
+
+            node = child
+
+        path_nodes.append(node)
+
+    return json.dumps(trie), path_nodes
+
+
+def exists_many(paths: list[str]) -> list[bool]:
+    """
+    Checks many paths at once. Returns, in the same order, whether each
+    path exists. Paths missing from the dentry cache are resolved
+    together in a single query, which also caches them.
+    """
+    global _dentry_hits, _dentry_misses
+
+    paths = [abs_path(path) for path in paths]
+    found: dict[str, tuple | None] = {}
+    _validate_dentry_cache()
+    private: OrderedDict | None = _transaction_dentries()
+    cache: OrderedDict = _dentry_cache if private is None else private
+
+    with _dentry_lock:
+        for path in paths:
+            if path in cache:
+                _dentry_hits += 1
+                cache.move_to_end(path)
+                found[path] = cache[path]
+        generation: int = _dentry_generation
+
+    missing: list[str] = list(dict.fromkeys(p for p in paths if p not in found))
+
+    if missing:
+        trie, path_nodes = _path_trie(missing)
+        cursor: sqlite3.Cursor = _get_connection().cursor()
+        cursor.execute(_sql().resolve_many, (trie,))
+        nodes: dict[int, tuple] = {node: tuple(rest) for node, *rest in cursor}
+
+        with _dentry_lock:
+            _dentry_misses += len(missing)
+
+        for path, node in zip(missing, path_nodes):
+            found[path] = nodes.get(node)
+
+        _cache_dentries({path: found[path] for path in missing}, generation, private)
+
+    return [found[path] is not None for path in paths]
+
+
+def stats_many(paths: list[str]) -> list[Entry | OSError]:
+    """
+    Returns the information of many entries at once, in the same order as
+    paths, from a single query. Instead of raising, a missing path gets a
+    FileNotFoundError in its place.
+    """
+    paths = [abs_path(path) for path in paths]
+    statements: _Statements = _sql()
+    trie, path_nodes = _path_trie(paths)
+
+    cursor: sqlite3.Cursor = _get_connection().cursor()
+    cursor.execute(statements.stats_many, (trie,))
+    records: dict[int, tuple] = {node: tuple(rest) for node, *rest in cursor}
+
+    results: list[Entry | OSError] = []
+
+    for path, node in zip(paths, path_nodes):
+        record: tuple | None = records.get(node)
+
+        if record is None:
+            results.append(
+                FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+            )
+        else:
+            results.append(_entry_from_columns(statements.metadata_columns, record))
+
+    return results
+
+
+def _invalidate(path: str, subtree: bool = False) -> None:
+    """
+    Drops a path from the dentry cache. If subtree is True, also drops every
+    cached path below it, e.g, when a directory is moved or deleted.
+    """
+    global _dentry_generation
 
-    drop_table(table_name)
-    create_table(table_name)
+    path = abs_path(path)
+    private: OrderedDict | None = _transaction_dentries()
 
-    with open(file_name) as file:
-        data = csv.reader(file)
+    with _dentry_lock:
+        _dentry_generation += 1
+        _forget_dentries(_dentry_cache, path, subtree)
 
-        for record in data:
-            _insert_entry(Entry(record))
+        # Dropped again on commit, see _publish_dentries()
+        if private is not None:
+            _forget_dentries(private, path, subtree)
+            _local.dropped.append((path, subtree))
 
 
-def _find_id(path: str) -> int:
+def clear_dentry_cache() -> None:
     """
-    Returns id of given path. Returns -1 if does not exist.
-    Must be full path beginning with "/".
+    Empties the dentry cache and resets its counters.
     """
-    path = abs_path(path)
-    parts: list[str] = path_split(path)
-    conn: sqlite3.Connection = sqlite3.connect(_db_path)
-    cursor: sqlite3.Cursor = conn.cursor()
-    curr_id: int = 0
+    global _dentry_hits, _dentry_misses
 
-    try:
-        if not parts or parts[0] != "/":
-            return -1
-
-        for i in range(1, len(parts)):
-            query: str = (
-                Query.from_(_table_name)
-                .select("id")
-                .where(Field("pid") == curr_id)
-                .where(Field("file_name") == parts[i])
-                .get_sql()
-            )
-            cursor.execute(query)
-            curr_id = cursor.fetchone()
+    _drop_dentries()
 
-            curr_id = curr_id[0] if curr_id else -1
+    with _dentry_lock:
+        _dentry_hits = 0
+        _dentry_misses = 0
 
-    except sqlite3.Error as e:
-        print(f"Error: {e}")
-    finally:
-        conn.close()
 
-    return curr_id
+def set_dentry_cache_size(size: int) -> None:
+    """
+    Set max number of paths kept in the dentry cache.
+    """
+    global _dentry_cache_size
+
+    with _dentry_lock:
+        _dentry_cache_size = size
+        while len(_dentry_cache) > _dentry_cache_size:
+            _dentry_cache.popitem(last=False)
 
 
-def _next_id() -> int:
+def dentry_cache_info() -> dict[str, int]:
     """
-    Returns next available ID.
+    Returns hit/miss counters and the current and max size of the dentry cache.
     """
+    with _dentry_lock:
+        return {
+            "hits": _dentry_hits,
+            "misses": _dentry_misses,
+            "size": len(_dentry_cache),
+            "max_size": _dentry_cache_size,
+        }
 
-    conn: sqlite3.Connection = sqlite3.connect(_db_path)
-    cursor: sqlite3.Cursor = conn.cursor()
-    try:
-        query: str = (
-            Query.from_(_table_name)
-            .select("id")
-            .orderby("id", order=Order.desc)
-            .limit(1)
-            .get_sql()
-        )
-
-        cursor.execute(query)
 
-        temp: tuple = cursor.fetchone()
+def _find_id(path: str) -> int:
+    """
+    Returns id of given path. Returns -1 if does not exist.
+    Must be full path beginning with "/".
+    """
+    found: tuple | None = _lookup(path)
 
-        nextId: int | None = temp[0] + 1 if temp else 1
-        return nextId
-    except sqlite3.Error as e:
-        print(f"Error: {e}")
-    finally:
-        conn.close()
+    return found[0] if found else -1
 
 
-def _insert_entry(record: tuple | Entry) -> None:
+def _insert_entry(record: tuple | Entry) -> int | None:
     """
     Insert an entry into the table of the fileSystem database.
-    Does not validate data. Must be correct format.
+    Does not validate data. Must be correct format. Returns the id of the
+    new entry, assigned by sqlite if the id is None.
     """
 
-    conn: sqlite3.Connection = sqlite3.connect(_db_path)
-    cursor: sqlite3.Cursor = conn.cursor()
-
     try:
         if isinstance(record, Entry):
             record = dict(record).values()
 
-        query: str = Query.into(_table_name).insert(*record).get_sql()
-        cursor.execute(query)
-        conn.commit()
+        with transaction() as conn:
+            cursor: sqlite3.Cursor = conn.cursor()
+            cursor.execute(_sql().insert, tuple(record))
+        return cursor.lastrowid
 
     except sqlite3.Error as e:
-        print(f"Error: {e}")
-    finally:
-        conn.close()
+        _report_error(e)
 
 
 def path_exists(path: str) -> bool:
     """
     Returns true if path exists. Must be a full path beginning with "/"
     """
-    path = abs_path(path)
-
-    if path == "/":
-        return True
-
-    parts: list[str] = path_split(path)
-    conn: sqlite3.Connection = sqlite3.connect(_db_path)
-    cursor: sqlite3.Cursor = conn.cursor()
-    curr_id: int = 0
-
-    try:
-        if not parts or parts[0] != "/":
-            return False
-
-        for i in range(1, len(parts)):
-            query: str = (
-                Query.from_(_table_name)
-                .select("id")
-                .where(Field("pid") == curr_id)
-                .where(Field("file_name") == parts[i])
-                .get_sql()
-            )
-            cursor.execute(query)
-            curr_id = cursor.fetchone()
-            if not curr_id:
-                return False
-
-    except sqlite3.Error as e:
-        print(f"Error: {e}")
-    finally:
-        conn.close()
-
-    return True
+    return _lookup(path) is not None
 
 
 def stats(path: str) -> Entry:
@@ -409,28 +1556,19 @@ def stats(path: str) -> Entry:
     entry: Entry = None
     entry_id: int = None
 
-    conn: sqlite3.Connection = sqlite3.connect(_db_path)
+    conn: sqlite3.Connection = _get_connection()
     cursor: sqlite3.Cursor = conn.cursor()
 
     try:
         entry_id: int = _find_id(path)
-        query: str = (
-            Query.from_(_table_name)
-            .select("*")
-            .where(Field("id") == entry_id)
-            .get_sql()
-        )
-
-        cursor.execute(query)
+        cursor.execute(_sql().select_by_id, (entry_id,))
 
         record: tuple = cursor.fetchone()
         entry = Entry(record)
         return entry
 
     except sqlite3.Error as e:
-        print(f"Error: {e}")
-    finally:
-        conn.close()
+        _report_error(e)
 
 
 def is_dir(path: str) -> bool:
@@ -439,45 +1577,9 @@ def is_dir(path: str) -> bool:
     Returns True if exists and file_type is a directory.
     Returns False if does not exist or file_type is file.
     """
-    path = abs_path(path)
-
-    if path == "/":
-        return True
-
-    parts: list[str] = path_split(path)
-    conn: sqlite3.Connection = sqlite3.connect(_db_path)
-    cursor: sqlite3.Cursor = conn.cursor()
-    curr_id: int = 0
-    file_type: str = None
-
-    try:
-        if not parts or parts[0] != "/":
-            return False
-
-        for i in range(1, len(parts)):
-            query: str = (
-                Query.from_(_table_name)
-                .select("id", "file_type")
-                .where(Field("pid") == curr_id)
-                .where(Field("file_name") == parts[i])
-                .get_sql()
-            )
-            cursor.execute(query)
-            row: tuple = cursor.fetchone()
-
-            if not row:
-                return False
-            else:
-                curr_id, file_type = row
-
-        return True if file_type == "directory" else False
+    found: tuple | None = _lookup(path)
 
-    except sqlite3.Error as e:
-        print(f"Error: {e}")
-    finally:
-        conn.close()
-
-    return True
+    return found is not None and found[2] == "directory"
 
 
 def is_file(path: str) -> bool:
@@ -498,42 +1600,175 @@ def norm_path(path: str) -> str:
     return os.path.normpath(path)
 
 
-def list_dir(path: str) -> list[Entry]:
+def list_dir(path: str, columns: list[str] | None = None) -> list[Entry]:
     """
-    Returns all entries within a directory.
+    Returns all entries within a directory, read with a single query. If
+    columns is passed in, only those columns are read and the other
+    attributes of each Entry are left as None, e.g, ["file_name", "file_type"]
+    for a short listing. File content is never read.
     """
     path = abs_path(path)
+    found: tuple | None = _lookup(path)
 
-    if not path_exists(path):
+    if not found:
         _throw_FileNotFoundError(path)
-    if not is_dir(path):
+    if found[2] != "directory":
         _throw_NotADirectoryError(path)
 
-    conn: sqlite3.Connection = sqlite3.connect(_db_path)
+    conn: sqlite3.Connection = _get_connection()
     cursor: sqlite3.Cursor = conn.cursor()
     entries: list[Entry] = []
 
     try:
-        entry_id: int = _find_id(path)
-        query: str = (
-            Query.from_(_table_name)
-            .select("*")
-            .where(Field("pid") == entry_id)
-            .get_sql()
-        )
-        cursor.execute(query)
-
-        for record in cursor:
-            entries.append(Entry(record))
+        if columns is None:
+            cursor.execute(_sql().select_children, (found[0],))
+            entries = [Entry(record) for record in cursor]
+        else:
+            cursor.execute(_sql().select_children_columns(columns), (found[0],))
+            entries = [_entry_from_columns(columns, record) for record in cursor]
         return entries
     except sqlite3.Error as e:
-        print(f"Error: {e}")
-    finally:
-        conn.close()
+        _report_error(e)
 
     return entries
 
 
+def walk_entries(
+    top: str, columns: list[str] | None = None
+) -> Iterator[tuple[str, list[Entry]]]:
+    """
+    Yields (dirpath, entries) for every directory under top, top included,
+    ordered by path, from a single query. entries holds the children of
+    dirpath with the given columns, by default all metadata columns.
+    """
+    top = abs_path(top)
+    found: tuple | None = _lookup(top)
+
+    if not found:
+        _throw_FileNotFoundError(top)
+    if found[2] != "directory":
+        _throw_NotADirectoryError(top)
+
+    statements: _Statements = _sql()
+    columns = columns if columns else statements.metadata_columns
+    columns = ["file_name", "file_type"] + [
+        column for column in columns if column not in ("file_name", "file_type")
+    ]
+
+    cursor: sqlite3.Cursor = _get_connection().cursor()
+    # Paths are built by appending "/name", so root starts out empty
+    cursor.execute(
+        statements.walk_columns(columns), (found[0], "" if top == "/" else top)
+    )
+
+    dirpath: str | None = None
+    entries: list[Entry] = []
+
+    for path, is_child, *record in cursor:
+        if is_child:
+            entries.append(_entry_from_columns(columns, record))
+            continue
+
+        if dirpath is not None:
+            yield dirpath, entries
+
+        dirpath, entries = path or "/", []
+
+    if dirpath is not None:
+        yield dirpath, entries
+
+
+def walk(top: str) -> Iterator[tuple[str, list[str], list[str]]]:
+    """
+    Like os.walk, yields (dirpath, dirnames, filenames) for every directory
+    in the tree rooted at top, top-down and ordered by path, from a single
+    query. Unlike os.walk, changing dirnames does not prune the walk.
+    """
+    for dirpath, entries in walk_entries(top, ["file_name", "file_type"]):
+        dirnames: list[str] = []
+        filenames: list[str] = []
+
+        for entry in entries:
+            if entry.file_type == "directory":
+                dirnames.append(entry.file_name)
+            else:
+                filenames.append(entry.file_name)
+
+        yield dirpath, dirnames, filenames
+
+
+def find(
+    top: str,
+    name: str | None = None,
+    file_type: str | None = None,
+    min_size: float | None = None,
+    max_size: float | None = None,
+    newer_than: str | None = None,
+    older_than: str | None = None,
+    perm: int | None = None,
+    perm_all: bool = False,
+    mindepth: int = 0,
+    maxdepth: int | None = None,
+) -> Iterator[str]:
+    """
+    Yields the path of every entry in the tree rooted at top, top included,
+    that matches all the filters given:
+
+        name                    file name matches the GLOB pattern
+        file_type               "file" or "directory"
+        min_size, max_size      file_size within the bounds, inclusive
+        newer_than, older_than  modification_time after or before, as
+                                "YYYY-MM-DD HH:MM:SS"
+        perm                    permissions are exactly perm, e.g. 0o755, or
+                                with perm_all, include all of its bits
+        mindepth, maxdepth      depth below top, top being 0
+
+    Paths come from a single query, breadth first.
+    """
+    top = abs_path(top)
+    found: tuple | None = _lookup(top)
+
+    if not found:
+        _throw_FileNotFoundError(top)
+
+    pattern: str | None = None
+
+    if perm is not None:
+        pattern = stat.filemode(perm & 0o777)[1:]
+
+        # Bits not in perm may be either set or not
+        if perm_all:
+            pattern = "".join(
+                "?" if char == "-" else char for char in pattern
+            )
+
+    values: dict[str, object] = {
+        "name": name,
+        "file_type": file_type,
+        "min_size": min_size,
+        "max_size": max_size,
+        "newer_than": newer_than,
+        "older_than": older_than,
+        "perm": pattern,
+    }
+    filters: tuple[str, ...] = tuple(
+        key for key in _find_conditions if values[key] is not None
+    )
+    params: list = [found[0], "" if top == "/" else top]
+
+    if maxdepth is not None:
+        params.append(maxdepth)
+
+    params.append(mindepth)
+    params.extend(values[key] for key in filters)
+
+    cursor: sqlite3.Cursor = _get_connection().cursor()
+    cursor.execute(_sql().find_filters(filters, maxdepth is not None), params)
+
+    for (path,) in cursor:
+        yield path or "/"
+
+
 def chmod(path: str, mode: int) -> None:
     """
     Changes the permissions on a file/directory given octal 3-digit number.
@@ -543,9 +1778,6 @@ def chmod(path: str, mode: int) -> None:
     if not path_exists(path):
         _throw_FileNotFoundError(path)
 
-    conn: sqlite3.Connection = sqlite3.connect(_db_path)
-    cursor: sqlite3.Cursor = conn.cursor()
-
     if is_dir(path):
         mode += 0o40000
     else:
@@ -555,23 +1787,17 @@ def chmod(path: str, mode: int) -> None:
 
     try:
         entry_id: int = _find_id(path)
-        query: str = (
-            Query.update(_table_name)
-            .set(Field("permissions"), modeStr)
-            .where(Field("id") == entry_id)
-            .get_sql()
-        )
-        cursor.execute(query)
-        conn.commit()
+
+        with transaction() as conn:
+            conn.execute(_sql().update_permissions, (modeStr, entry_id))
     except sqlite3.Error as e:
-        print(f"Error: {e}")
-    finally:
-        conn.close()
+        _report_error(e)
 
 
 def copy_file(src: str, dest: str) -> None:
     """
-    Copies a file from src to dest.
+    Copies a file from src to dest. The copy shares the content of src in
+    the content store until either of them is written to.
     """
     src = abs_path(src)
     dest = abs_path(dest)
@@ -614,20 +1840,343 @@ def copy_file(src: str, dest: str) -> None:
             _throw_FileExistsError(new_path)
 
     pid: int = _find_id(parent)
+    src_id: int = _find_id(src)
     new_file: Entry = stats(src)
     new_file.file_name = new_file_name
     new_file.pid = pid
-    new_file.id = _next_id()
+    new_file.id = None
     new_file.modification_time = datetime.datetime.fromtimestamp(
         datetime.datetime.now().timestamp()
     ).isoformat(sep=" ", timespec="seconds")
 
-    _insert_entry(new_file)
+    # The copy points at the same content as src, nothing is duplicated
+    try:
+        with transaction() as conn:
+            cursor: sqlite3.Cursor = conn.cursor()
+            cursor.execute(_sql().insert, tuple(dict(new_file).values()))
+            cursor.execute(_sql().copy_data, (cursor.lastrowid, src_id))
+        _invalidate(new_path)
+    except sqlite3.Error as e:
+        _report_error(e)
+
+
+class FileHandle:
+    """
+    Handle to the content of a file, returned by open_file(). Modes are "r",
+    "r+", "w" and "a" as for open(). Changes are committed on close().
+    """
+
+    def __init__(self, path: str, mode: str = "r") -> None:
+        """
+        Opens the file at path. Raises FileNotFoundError if it does not
+        exist and mode is "r" or "r+". Raises IsADirectoryError if path is
+        a directory.
+        """
+        if mode not in ("r", "r+", "w", "a"):
+            raise ValueError(f"invalid mode: '{mode}'")
+
+        self.path: str = abs_path(path)
+        self.mode: str = mode
+        self.closed: bool = False
+
+        found: tuple | None = _lookup(self.path)
+
+        if not found:
+            if mode in ("r", "r+"):
+                _throw_FileNotFoundError(self.path)
+            touch(self.path)
+            found = _lookup(self.path)
+
+        if found[2] == "directory":
+            _throw_IsADirectoryError(self.path)
+
+        self._id: int = found[0]
+        self._conn: sqlite3.Connection = _get_connection()
+        self._cursor: sqlite3.Cursor = self._conn.cursor()
+        self._size: int = self._cursor.execute(
+            _sql().select_data_size, (self._id,)
+        ).fetchone()[0]
+        self._pos: int = 0
+        self._pending: bytearray = bytearray()  # Buffered writes, not yet stored
+        self._pending_pos: int = 0  # Offset in the file of self._pending
+        self._modified: bool = False
+
+        if mode == "w":
+            self.truncate(0)
+        elif mode == "a":
+            self._pos = self._size
+
+    def __enter__(self) -> "FileHandle":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _check(self, writing: bool = False) -> None:
+        """
+        Raises ValueError if closed, io.UnsupportedOperation if writing to a
+        handle opened for reading only.
+        """
+        if self.closed:
+            raise ValueError("I/O operation on closed file")
+        if writing and self.mode == "r":
+            raise io.UnsupportedOperation("not writable")
+
+    def _end(self) -> int:
+        """
+        Returns the size of the file, including buffered writes.
+        """
+        if not self._pending:
+            return self._size
+
+        return max(self._size, self._pending_pos + len(self._pending))
+
+    def _load_chunks(self, first: int, last: int) -> dict[int, bytes]:
+        """
+        Returns the stored chunks with seq between first and last.
+        """
+        self._cursor.execute(_sql().select_chunks, (self._id, first, last))
+        return dict(self._cursor.fetchall())
+
+    def _flush(self, count: int | None = None) -> None:
+        """
+        Stores the first count bytes of the write buffer, all of it if count
+        is None. Only the chunks covered are rewritten, keeping the bytes of
+        the first and last chunk outside the written range.
+        """
+        count = len(self._pending) if count is None else count
+
+        if not count:
+            return
+
+        # Holds the write lock from the first write until close()
+        _begin(self._conn)
+        data: bytes = bytes(self._pending[:count])
+        offset: int = self._pending_pos
+        del self._pending[:count]
+        self._pending_pos += count
+
+        first: int = offset // _chunk_size
+        last: int = (offset + len(data) - 1) // _chunk_size
+        chunks: dict[int, bytes] = self._load_chunks(first, first)
+
+        if last != first:
+            chunks.update(self._load_chunks(last, last))
+
+        head: bytes = chunks.get(first, b"")[: offset - first * _chunk_size]
+        tail: bytes = chunks.get(last, b"")[offset + len(data) - last * _chunk_size :]
+        buffer: bytes = head + data + tail
+        rows: list[tuple] = []
+
+        for i, start in enumerate(range(0, len(buffer), _chunk_size)):
+            content_hash: str = _store_content(
+                self._cursor, buffer[start : start + _chunk_size]
+            )
+            rows.append((self._id, first + i, content_hash))
+
+        self._cursor.executemany(_sql().upsert_data, rows)
+        _collect_garbage(self._cursor)
+        self._size = max(self._size, offset + len(data))
+
+    def read(self, size: int = -1) -> bytes:
+        """
+        Reads up to size bytes from the current position, or to the end of
+        the file if size is negative.
+        """
+        self._check()
+        self._flush()
+
+        end: int = self._size if size < 0 else min(self._size, self._pos + size)
+
+        if end <= self._pos:
+            return b""
+
+        first: int = self._pos // _chunk_size
+        last: int = (end - 1) // _chunk_size
+        chunks: dict[int, bytes] = self._load_chunks(first, last)
+        buffer: bytes = b"".join(chunks.get(seq, b"") for seq in range(first, last + 1))
+        start: int = self._pos - first * _chunk_size
+
+        data: bytes = buffer[start : start + end - self._pos]
+        self._pos += len(data)
+        return data
+
+    def write(self, data: bytes | str) -> int:
+        """
+        Writes data at the current position, or at the end of the file in
+        append mode. Returns the number of bytes written.
+        """
+        self._check(writing=True)
+        data = data.encode() if isinstance(data, str) else data
+        written: int = len(data)
+
+        if self.mode == "a":
+            self._pos = self._end()
+
+        # Writing past the end fills the gap with zeros
+        if self._pos > self._end():
+            data = bytes(self._pos - self._end()) + data
+            self._pos = self._end()
+
+        if self._pending and self._pos == self._pending_pos + len(self._pending):
+            self._pending += data
+        else:
+            self._flush()
+            self._pending_pos = self._pos
+            self._pending = bytearray(data)
+
+        self._pos += len(data)
+        self._modified = True
+
+        # Store every chunk the buffer has filled, keep the rest buffered
+        end: int = self._pending_pos + len(self._pending)
+        full: int = end // _chunk_size * _chunk_size - self._pending_pos
+
+        if full > 0:
+            self._flush(full)
+
+        return written
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        """
+        Changes the current position, relative to the start of the file,
+        the current position or the end of the file. Returns the new position.
+        """
+        self._check()
+
+        if whence == os.SEEK_CUR:
+            offset += self._pos
+        elif whence == os.SEEK_END:
+            offset += self._end()
+
+        if offset < 0:
+            raise ValueError(f"negative seek position {offset}")
+
+        self._pos = offset
+        return self._pos
+
+    def tell(self) -> int:
+        """
+        Returns the current position.
+        """
+        self._check()
+        return self._pos
+
+    def truncate(self, size: int | None = None) -> int:
+        """
+        Cuts the file down to size bytes, the current position if size is
+        None. Returns the new size.
+        """
+        self._check(writing=True)
+        self._flush()
+        size = self._pos if size is None else size
+
+        if size >= self._size:
+            return self._size
+
+        _begin(self._conn)
+        keep: int = -(-size // _chunk_size)  # Chunks still needed, rounded up
+        self._cursor.execute(_sql().delete_data_from, (self._id, keep))
+
+        # Cut the last kept chunk if the new size ends within it
+        if size % _chunk_size:
+            chunk: bytes = self._load_chunks(keep - 1, keep - 1).get(keep - 1, b"")
+            content_hash: str = _store_content(
+                self._cursor, chunk[: size % _chunk_size]
+            )
+            self._cursor.execute(_sql().upsert_data, (self._id, keep - 1, content_hash))
+
+        _collect_garbage(self._cursor)
+        self._size = size
+        self._modified = True
+        return size
+
+    def close(self) -> None:
+        """
+        Stores buffered writes, updates file_size and modification_time if
+        the file was changed, and commits. A handle that was only read
+        from just closes, without taking the write lock.
+        """
+        if self.closed:
+            return
+
+        if not self._modified and not self._pending:
+            self.closed = True
+            return
+
+        try:
+            # Also commits the chunks already flushed, unless the handle is
+            # used within a transaction() block, which then commits them
+            with transaction():
+                self._flush()
+
+                if self._modified:
+                    curr_time: str = datetime.datetime.fromtimestamp(
+                        datetime.datetime.now().timestamp()
+                    ).isoformat(sep=" ", timespec="seconds")
+                    self._cursor.execute(
+                        _sql().update_size_mtime, (self._size, curr_time, self._id)
+                    )
+        except sqlite3.Error as e:
+            _report_error(e)
+        finally:
+            self.closed = True
+
+
+def open_file(path: str, mode: str = "r") -> FileHandle:
+    """
+    Opens a file in the file system and returns a FileHandle to stream its
+    content. See FileHandle for the modes.
+    """
+    return FileHandle(path, mode)
+
+
+def read_file(path: str) -> bytes:
+    """
+    Returns the whole content of a file. Use open_file() to read large
+    files in parts.
+    """
+    with open_file(path) as file:
+        return file.read()
+
+
+def write_file(path: str, data: bytes | str) -> None:
+    """
+    Replaces the content of a file, creating the file if it does not exist.
+    Copies sharing the old content keep it.
+    """
+    with open_file(path, "w") as file:
+        file.write(data)
+
+
+def dedup_report() -> dict[str, int]:
+    """
+    Returns the bytes of content as seen by all files (logical_bytes), as
+    actually stored once per distinct content (stored_bytes), and the
+    bytes saved by deduplication (saved_bytes).
+    """
+    conn: sqlite3.Connection = _get_connection()
+    cursor: sqlite3.Cursor = conn.cursor()
+    logical: int = 0
+    stored: int = 0
+
+    try:
+        logical, stored = cursor.execute(_sql().dedup_report).fetchone()
+    except sqlite3.Error as e:
+        _report_error(e)
+
+    return {
+        "logical_bytes": logical,
+        "stored_bytes": stored,
+        "saved_bytes": logical - stored,
+    }
 
 
 def move(src: str, dest: str) -> None:
     """
-    Moves a file from src to dest.
+    Moves a file or directory from src to dest. Only the moved entry's row
+    is updated, however large the subtree. Raises OSError if a directory
+    would be moved into itself.
     """
     src = abs_path(src)
     dest = abs_path(dest)
@@ -667,55 +2216,27 @@ def move(src: str, dest: str) -> None:
         if path_exists(new_path):
             _throw_FileExistsError(new_path)
 
+    # A directory cannot be moved into itself or one of its descendants
+    if parent == src or parent.startswith(src.rstrip("/") + "/"):
+        _throw_OSError(src, dest)
+
     pid: int = _find_id(parent)
-    new_file: Entry = stats(src)
-    new_file.file_name = new_file_name
-    new_file.pid = pid
-    new_file.modification_time = datetime.datetime.fromtimestamp(
+    entry_id: int = _find_id(src)
+    curr_time: str = datetime.datetime.fromtimestamp(
         datetime.datetime.now().timestamp()
     ).isoformat(sep=" ", timespec="seconds")
 
-    if is_file(src):
-        remove(src)
-        _insert_entry(new_file)
-    else:
-        dir_entries: list[Entry] = list_dir(src)
-
-        for entry in dir_entries:
-            entry.pid = new_file.id
-            entry.modification_time = datetime.datetime.fromtimestamp(
-                datetime.datetime.now().timestamp()
-            ).isoformat(sep=" ", timespec="seconds")
-
-        conn: sqlite3.Connection = sqlite3.connect(_db_path)
-        cursor: sqlite3.Cursor = conn.cursor()
-
-        try:
-            for entry in dir_entries:
-                query: str = (
-                    Query.update(_table_name)
-                    .set(Field("pid"), new_file.id)
-                    .set(Field("modification_time"), entry.modification_time)
-                    .where(Field("id") == entry.id)
-                    .get_sql()
-                )
-                cursor.execute(query)
-                conn.commit()
-
-            query: str = (
-                Query.update(_table_name)
-                .set(Field("pid"), pid)
-                .set(Field("file_name"), new_file.file_name)
-                .set(Field("modification_time"), new_file.modification_time)
-                .where(Field("id") == new_file.id)
-                .get_sql()
+    # Children point at the id of a directory, which does not change, so
+    # only the moved entry itself is updated.
+    try:
+        with transaction() as conn:
+            conn.execute(
+                _sql().update_location, (pid, new_file_name, curr_time, entry_id)
             )
-            cursor.execute(query)
-            conn.commit()
-        except sqlite3.Error as e:
-            print(f"Error: {e}")
-        finally:
-            conn.close()
+        _invalidate(src, subtree=True)
+        _invalidate(new_path, subtree=True)
+    except sqlite3.Error as e:
+        _report_error(e)
 
 
 def make_dir(path: str) -> None:
@@ -734,7 +2255,6 @@ def make_dir(path: str) -> None:
 
     pid: int = _find_id(parent)
     new_dir: Entry = Entry()
-    new_dir.id = _next_id()
     new_dir.pid = pid
     new_dir.file_name = dest
     new_dir.file_type = "directory"
@@ -747,7 +2267,8 @@ def make_dir(path: str) -> None:
     new_dir.group_name = "user"
     new_dir.content = ""
 
-    _insert_entry(new_dir)
+    new_dir.id = _insert_entry(new_dir)
+    _invalidate(path)
 
 
 def remove(path: str) -> None:
@@ -761,21 +2282,16 @@ def remove(path: str) -> None:
     elif not is_file(path):
         _throw_IsADirectoryError(path)
 
-    conn: sqlite3.Connection = sqlite3.connect(_db_path)
-    cursor: sqlite3.Cursor = conn.cursor()
-
     try:
         entry_id: int = _find_id(path)
 
-        query: str = (
-            Query.from_(_table_name).delete().where(Field("id") == entry_id).get_sql()
-        )
-        cursor.execute(query)
-        conn.commit()
+        with transaction() as conn:
+            cursor: sqlite3.Cursor = conn.cursor()
+            cursor.execute(_sql().delete_by_id, (entry_id,))
+            _collect_garbage(cursor)
+        _invalidate(path)
     except sqlite3.Error as e:
-        print(f"Error: {e}")
-    finally:
-        conn.close()
+        _report_error(e)
 
 
 def remove_dir(path: str) -> None:
@@ -789,9 +2305,6 @@ def remove_dir(path: str) -> None:
     elif not is_dir(path):
         _throw_IsADirectoryError(path)
 
-    conn: sqlite3.Connection = sqlite3.connect(_db_path)
-    cursor: sqlite3.Cursor = conn.cursor()
-
     try:
         dir_entries: list[Entry] = list_dir(path)
 
@@ -801,20 +2314,18 @@ def remove_dir(path: str) -> None:
 
         entry_id: int = _find_id(path)
 
-        query: str = (
-            Query.from_(_table_name).delete().where(Field("id") == entry_id).get_sql()
-        )
-        cursor.execute(query)
-        conn.commit()
+        with transaction() as conn:
+            conn.execute(_sql().delete_by_id, (entry_id,))
+        _invalidate(path, subtree=True)
     except sqlite3.Error as e:
-        print(f"Error: {e}")
-    finally:
-        conn.close()
+        _report_error(e)
 
 
-def remove_tree(path: str) -> None:
+def remove_tree(path: str) -> int:
     """
     Recursively deletes everything in a directory, then deletes the directory.
+    The whole subtree is removed by one recursive DELETE in one transaction.
+    Returns the number of entries removed, including the directory itself.
     """
     path: str = abs_path(path)
 
@@ -823,58 +2334,21 @@ def remove_tree(path: str) -> None:
     elif not is_dir(path):
         _throw_NotADirectoryError(path)
 
-    conn: sqlite3.Connection = sqlite3.connect(_db_path)
-    cursor: sqlite3.Cursor = conn.cursor()
+    removed: int = 0
 
     try:
-        # Find id of top directory in tree
-        rootEntry_id: int = _find_id(path)
-
-        # Query to retrieve id,pid for all entries that have their pid
-        # set to rootEntry_id.
-        query: str = (
-            Query.from_(_table_name)
-            .select("id", "pid")
-            .where(Field("pid") == rootEntry_id)
-            .get_sql()
-        )
-        cursor.execute(query)
-        idPairs: list[tuple] = cursor.fetchall()
-
-        i: int = 0
-        # Iterate over all id,pid pairs to retrieve all entries to delete
-        while i < len(idPairs):
-            query = (
-                Query.from_(_table_name)
-                .select("id", "pid")
-                .where(Field("pid") == idPairs[i][0])
-                .get_sql()
-            )
-            cursor.execute(query)
-            temp = cursor.fetchall()
-            idPairs.extend(temp)
-            i += 1
-
-        # Remove all entries belonging to the top directory in tree
-        for id, pid in idPairs:
-            query: str = (
-                Query.from_(_table_name).delete().where(Field("id") == id).get_sql()
-            )
-            cursor.execute(query)
-
-        # Remove top directory in tree
-        query: str = (
-            Query.from_(_table_name)
-            .delete()
-            .where(Field("id") == rootEntry_id)
-            .get_sql()
-        )
-        cursor.execute(query)
-        conn.commit()
+        with transaction() as conn:
+            cursor: sqlite3.Cursor = conn.cursor()
+            cursor.execute(_sql().delete_subtree, (_find_id(path),))
+            # rowcount is not reported for statements starting with WITH, and
+            # changes() leaves out the rows deleted by triggers
+            removed = cursor.execute("SELECT changes()").fetchone()[0]
+            _collect_garbage(cursor)
+        _invalidate(path, subtree=True)
     except sqlite3.Error as e:
-        print(f"Error: {e}")
-    finally:
-        conn.close()
+        _report_error(e)
+
+    return removed
 
 
 def is_abs_path(path: str) -> bool:
@@ -905,8 +2379,6 @@ def touch(path: str) -> bool:
     """
     path = abs_path(path)
 
-    conn: sqlite3.Connection = sqlite3.connect(_db_path)
-    cursor: sqlite3.Cursor = conn.cursor()
     try:
         if path_exists(path):
             entry_id: int = _find_id(path)
@@ -914,15 +2386,8 @@ def touch(path: str) -> bool:
                 datetime.datetime.now().timestamp()
             ).isoformat(sep=" ", timespec="seconds")
 
-            query: str = (
-                Query.update(_table_name)
-                .set(Field("modification_time"), curr_time)
-                .where(Field("id") == entry_id)
-                .get_sql()
-            )
-
-            cursor.execute(query)
-            conn.commit()
+            with transaction() as conn:
+                conn.execute(_sql().update_mtime, (curr_time, entry_id))
         else:
             parent, new_file_name = os.path.split(path)
 
@@ -934,7 +2399,6 @@ def touch(path: str) -> bool:
             pid: int = _find_id(parent)
             entry: Entry = Entry()
             entry.pid = pid
-            entry.id = _next_id()
             entry.file_name = new_file_name
             entry.file_type = "file"
             entry.file_size = 0
@@ -946,12 +2410,11 @@ def touch(path: str) -> bool:
             entry.permissions = stat.filemode(0o100777)
             entry.content = ""
 
-            _insert_entry(entry)
+            entry.id = _insert_entry(entry)
+            _invalidate(path)
 
     except sqlite3.Error as e:
-        print(f"Error: {e}")
-    finally:
-        conn.close()
+        _report_error(e)
 
 
 if __name__ == "__main__":
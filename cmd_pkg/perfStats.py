@@ -0,0 +1,437 @@
+"""
+Instrumentation of fileSystem. While enabled, the functions of fileSystem
+that use the database and the reading and writing methods of FileHandle
+record, per call, the wall time, the SQL statements run, the connections opened and
+the bytes of file content (BLOB chunks) read from or written to the
+database.
+
+    from cmd_pkg import perfStats
+
+    perfStats.enable(slow_ms=50)
+    fileSystem.copy_file("/a", "/b")
+    print(perfStats.format_stats(perfStats.totals()))
+
+Enabling replaces the functions in fileSystem with timed wrappers, and
+disabling puts the originals back, so nothing is paid while disabled.
+Operations called by other operations, e.g. path_exists() within move(),
+are counted as part of the outermost one. Statements are counted by
+sqlite's trace hook, which also reports each trigger run by a statement.
+Operations slower than the threshold given to enable() are written to
+the slow-operation log, stderr by default.
+"""
+import functools, reprlib, sys, threading, time
+from collections.abc import Callable, Iterator
+from typing import TextIO
+
+from . import fileSystem
+
+# Functions of fileSystem recorded as operations
+_operations: tuple[str, ...] = (
+    "create_table",
+    "drop_table",
+    "csv_to_table",
+    "seed_from_csv",
+    "exists_many",
+    "stats_many",
+    "path_exists",
+    "stats",
+    "is_dir",
+    "is_file",
+    "list_dir",
+    "walk_entries",
+    "walk",
+    "find",
+    "chmod",
+    "copy_file",
+    "open_file",
+    "read_file",
+    "write_file",
+    "dedup_report",
+    "move",
+    "make_dir",
+    "remove",
+    "remove_dir",
+    "remove_tree",
+    "touch",
+    "set_cwd",
+)
+
+# Methods of FileHandle recorded as operations
+_file_methods: tuple[str, ...] = ("read", "write", "truncate", "close")
+
+_enabled: bool = False
+
+_originals: dict[tuple[object, str], Callable] = {}  # (owner, name) -> original
+
+_lock: threading.Lock = threading.Lock()  # Guards the tables below
+
+_local: threading.local = threading.local()  # Counters and depth of each thread
+
+_totals: dict[str, "OpStats"] = {}  # Since enabled or reset
+
+_command: dict[str, "OpStats"] = {}  # Of the command running
+
+_command_line: str = ""
+
+_last: dict[str, "OpStats"] = {}  # Of the command before it
+
+_last_line: str = ""
+
+_slow_seconds: float | None = None
+
+_slow_log: TextIO | None = None  # None for stderr
+
+
+class OpStats:
+    """
+    Totals of the calls of one operation.
+    """
+
+    __slots__ = ("calls", "seconds", "statements", "connections", "blob_bytes")
+
+    def __init__(self) -> None:
+        self.calls: int = 0
+        self.seconds: float = 0.0
+        self.statements: int = 0
+        self.connections: int = 0
+        self.blob_bytes: int = 0
+
+    def add(self, seconds: float, counts: list[int]) -> None:
+        """
+        Adds a call that took seconds and had counts of statements,
+        connections and blob bytes.
+        """
+        self.calls += 1
+        self.seconds += seconds
+        self.statements += counts[0]
+        self.connections += counts[1]
+        self.blob_bytes += counts[2]
+
+
+def _counts() -> list[int]:
+    """
+    Returns the statements, connections and blob bytes counted so far on
+    the calling thread.
+    """
+    counts: list[int] | None = getattr(_local, "counts", None)
+
+    if counts is None:
+        counts = _local.counts = [0, 0, 0]
+
+    return counts
+
+
+def _trace(statement: str) -> None:
+    """
+    Trace callback of every connection while enabled.
+    """
+    _counts()[0] += 1
+
+
+def _record(name: str, args: tuple, seconds: float, counts: list[int]) -> None:
+    """
+    Adds a call of name to the totals and the running command, and logs
+    it if slower than the threshold.
+    """
+    with _lock:
+        for table in (_totals, _command):
+            if name not in table:
+                table[name] = OpStats()
+            table[name].add(seconds, counts)
+
+    if _slow_seconds is not None and seconds >= _slow_seconds:
+        print(
+            f"slow: {name}({', '.join(map(reprlib.repr, args))}) "
+            f"{seconds * 1000:.1f}ms, {counts[0]} statements, "
+            f"{counts[1]} connections, {counts[2]} blob bytes",
+            file=_slow_log or sys.stderr,
+        )
+
+
+def _operation(name: str, func: Callable, method: bool = False) -> Callable:
+    """
+    Returns func wrapped to record its calls as operation name, unless
+    called from within another operation.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if getattr(_local, "depth", 0):
+            return func(*args, **kwargs)
+
+        counts: list[int] = _counts()
+        before: list[int] = counts.copy()
+        _local.depth = 1
+        start: float = time.perf_counter()
+
+        try:
+            return func(*args, **kwargs)
+        finally:
+            seconds: float = time.perf_counter() - start
+            _local.depth = 0
+            _record(
+                name,
+                args[1:] if method else args,
+                seconds,
+                [after - first for after, first in zip(counts, before)],
+            )
+
+    return wrapper
+
+
+def _generator_operation(name: str, func: Callable) -> Callable:
+    """
+    Like _operation() for generator functions, e.g. walk(). Only the time
+    spent producing items is counted, not the caller's work in between,
+    and the call is recorded once the generator is finished or closed.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs) -> Iterator:
+        iterator: Iterator = func(*args, **kwargs)
+        seconds: float = 0.0
+        counts: list[int] = [0, 0, 0]
+        timed: bool = False  # Whether any item was produced outside an operation
+
+        try:
+            while True:
+                if getattr(_local, "depth", 0):
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        return
+                    yield item
+                    continue
+
+                timed = True
+                current: list[int] = _counts()
+                before: list[int] = current.copy()
+                _local.depth = 1
+                start: float = time.perf_counter()
+
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    seconds += time.perf_counter() - start
+                    _local.depth = 0
+                    for i, (after, first) in enumerate(zip(current, before)):
+                        counts[i] += after - first
+
+                yield item
+        finally:
+            iterator.close()
+
+            if timed:
+                _record(name, args, seconds, counts)
+
+    return wrapper
+
+
+def _open_connection(original: Callable) -> Callable:
+    """
+    Returns fileSystem._open_connection wrapped to count connections and
+    trace their statements.
+    """
+
+    @functools.wraps(original)
+    def wrapper():
+        conn = original()
+        conn.set_trace_callback(_trace)
+        _counts()[1] += 1
+        return conn
+
+    return wrapper
+
+
+def _store_content(original: Callable) -> Callable:
+    """
+    Returns fileSystem._store_content wrapped to count the bytes written.
+    """
+
+    @functools.wraps(original)
+    def wrapper(cursor, data: bytes) -> str:
+        _counts()[2] += len(data)
+        return original(cursor, data)
+
+    return wrapper
+
+
+def _store_contents(original: Callable) -> Callable:
+    """
+    Returns fileSystem._store_contents wrapped to count the bytes written.
+    """
+
+    @functools.wraps(original)
+    def wrapper(cursor, contents: list[tuple], table_name: str | None = None) -> None:
+        _counts()[2] += sum(len(row[2]) for row in contents)
+        return original(cursor, contents, table_name)
+
+    return wrapper
+
+
+def _load_chunks(original: Callable) -> Callable:
+    """
+    Returns FileHandle._load_chunks wrapped to count the bytes read.
+    """
+
+    @functools.wraps(original)
+    def wrapper(self, first: int, last: int) -> dict[int, bytes]:
+        chunks: dict[int, bytes] = original(self, first, last)
+        _counts()[2] += sum(map(len, chunks.values()))
+        return chunks
+
+    return wrapper
+
+
+def _replace(owner: object, name: str, wrapper: Callable) -> None:
+    """
+    Replaces attribute name of owner with wrapper, keeping the original.
+    """
+    _originals[(owner, name)] = getattr(owner, name)
+    setattr(owner, name, wrapper)
+
+
+def enable(slow_ms: float | None = None, log: TextIO | None = None) -> None:
+    """
+    Starts recording operations, if not already. Operations taking at
+    least slow_ms milliseconds are written to log, stderr if None. The
+    counts of the connections already open are included from now on.
+    """
+    global _enabled, _slow_seconds, _slow_log
+    import inspect
+
+    _slow_seconds = None if slow_ms is None else slow_ms / 1000
+    _slow_log = log
+
+    if _enabled:
+        return
+
+    for name in _operations:
+        value: Callable = getattr(fileSystem, name)
+
+        if inspect.isgeneratorfunction(value):
+            _replace(fileSystem, name, _generator_operation(name, value))
+        else:
+            _replace(fileSystem, name, _operation(name, value))
+
+    handle: type = fileSystem.FileHandle
+
+    for name in _file_methods:
+        _replace(
+            handle, name, _operation(f"FileHandle.{name}", getattr(handle, name), True)
+        )
+
+    _replace(fileSystem, "_open_connection", _open_connection(fileSystem._open_connection))
+    _replace(fileSystem, "_store_content", _store_content(fileSystem._store_content))
+    _replace(
+        fileSystem, "_store_contents", _store_contents(fileSystem._store_contents)
+    )
+    _replace(handle, "_load_chunks", _load_chunks(handle._load_chunks))
+
+    with fileSystem._connections_lock:
+        for conn in fileSystem._connections:
+            conn.set_trace_callback(_trace)
+
+    _enabled = True
+
+
+def disable() -> None:
+    """
+    Stops recording and restores the original functions. What was
+    recorded is kept until reset().
+    """
+    global _enabled
+
+    if not _enabled:
+        return
+
+    for (owner, name), original in _originals.items():
+        setattr(owner, name, original)
+    _originals.clear()
+
+    with fileSystem._connections_lock:
+        for conn in fileSystem._connections:
+            conn.set_trace_callback(None)
+
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    """
+    Returns True while operations are recorded.
+    """
+    return _enabled
+
+
+def reset() -> None:
+    """
+    Forgets everything recorded so far.
+    """
+    global _command, _last, _last_line
+
+    with _lock:
+        _totals.clear()
+        _command = {}
+        _last, _last_line = {}, ""
+
+
+def begin_command(line: str) -> None:
+    """
+    Marks the start of a shell command line: what the previous line
+    recorded becomes last_command(). Does nothing while disabled.
+    """
+    global _command, _command_line, _last, _last_line
+
+    if not _enabled:
+        return
+
+    with _lock:
+        _last, _last_line = _command, _command_line
+        _command, _command_line = {}, line
+
+
+def last_command() -> tuple[str, dict[str, OpStats]]:
+    """
+    Returns the previous command line and the operations it ran.
+    """
+    with _lock:
+        return _last_line, dict(_last)
+
+
+def totals() -> dict[str, OpStats]:
+    """
+    Returns the operations run since enabled or reset.
+    """
+    with _lock:
+        return dict(_totals)
+
+
+def format_stats(stats: dict[str, OpStats]) -> str:
+    """
+    Returns stats as a table, slowest operation first, with a total row.
+    """
+    total: OpStats = OpStats()
+    lines: list[str] = [
+        f"{'operation':<20} {'calls':>7} {'ms':>10} {'statements':>10} "
+        f"{'connections':>11} {'blob bytes':>12}"
+    ]
+
+    for name, op in sorted(stats.items(), key=lambda item: -item[1].seconds):
+        lines.append(
+            f"{name:<20} {op.calls:>7} {op.seconds * 1000:>10.3f} {op.statements:>10} "
+            f"{op.connections:>11} {op.blob_bytes:>12}"
+        )
+        total.calls += op.calls
+        total.seconds += op.seconds
+        total.statements += op.statements
+        total.connections += op.connections
+        total.blob_bytes += op.blob_bytes
+
+    lines.append(
+        f"{'total':<20} {total.calls:>7} {total.seconds * 1000:>10.3f} "
+        f"{total.statements:>10} {total.connections:>11} {total.blob_bytes:>12}"
+    )
+
+    return "\n".join(lines)
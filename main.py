@@ -1,6 +1,9 @@
-import cmd_pkg
-from cmd_pkg import fileSystem
+import argparse, itertools, sqlite3, sys, time
+from collections.abc import Iterable
+from contextlib import nullcontext
+from cmd_pkg import fileSystem, perfStats
 from ParseCommand import parseCommand, ShellCommand
+from Pipeline import runPipeline
 
 # DB Constants
 DB_PATH: str = "filesystem.sqlite"
@@ -25,11 +28,24 @@ def prompt() -> str:
     return f"{directory}{GREEN+BOLD}$: {RESET}"
 
 
-if __name__ == "__main__":
-    fileSystem.set_db_path(DB_PATH)
-    fileSystem.set_table_name(TABLE_NAME)
-    fileSystem.csv_to_table(CSV_FILE)
+def runLine(cmdStr: str, color: bool = True) -> None:
+    """
+    Parses and runs one line of commands, printing the output line by line
+    as the last command produces it.
+    """
+    # What the line's operations cost is shown by `perf' once it is on
+    perfStats.begin_command(cmdStr)
+    # Pipeline of one or more commands, split on "|"
+    commandList: list[ShellCommand] = parseCommand(cmdStr)
 
+    for line in runPipeline(commandList, color):
+        print(line)
+
+
+def interactive() -> None:
+    """
+    Reads and runs commands from the user until `exit' or Ctrl-C.
+    """
     while True:  # Exits when `exit` is entered
         cmdStr = ""
 
@@ -38,25 +54,144 @@ if __name__ == "__main__":
         # Exit if Ctrl-C is entered
         except KeyboardInterrupt:
             print("\n")
+            fileSystem.close()
             raise SystemExit
 
-        # Singular, "simple" command is parsed
-        temp = parseCommand(cmdStr)
-
-        if not temp:
-            # Empty string, just skip this iteration
-            continue
-
-        shellCmd: ShellCommand = temp[0]
-
-        if callable(getattr(cmd_pkg, shellCmd.name, None)):
-            commandFunc = getattr(cmd_pkg, shellCmd.name)
-            result = commandFunc(
-                flags=shellCmd.flags,
-                params=shellCmd.params,
-                stdin=shellCmd.stdin,
-                stdout=shellCmd.stdout,
-            )
-            print(result)
-        else:
-            print(f"{shellCmd.name}: command not found")
+        runLine(cmdStr)
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """
+    Returns the value below which percent of the sorted values fall.
+    """
+    if not values:
+        return 0.0
+
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+def batch(lines: Iterable[str], useTransaction: bool, showStats: bool) -> int:
+    """
+    Runs lines of commands without a prompt or colors, stopping at `exit'.
+    Blank lines and lines starting with "#" are skipped. A command that
+    fails is reported on stderr and the rest still run. With useTransaction
+    all of them are committed together at the end, and none of them if a
+    command fails in the database, which stops the batch. With showStats a
+    summary of the throughput and latency is written to stderr. Returns
+    the number of failed commands.
+    """
+    latencies: list[float] = []
+    failed: int = 0
+    start: float = time.perf_counter()
+
+    try:
+        with fileSystem.transaction() if useTransaction else nullcontext():
+            for cmdStr in lines:
+                cmdStr = cmdStr.strip()
+
+                if not cmdStr or cmdStr.startswith("#"):
+                    continue
+                if cmdStr.split()[0] == "exit":
+                    break
+
+                began: float = time.perf_counter()
+
+                try:
+                    runLine(cmdStr, color=False)
+                except Exception as error:
+                    print(f"{cmdStr}: {error}", file=sys.stderr)
+                    failed += 1
+
+                    # Leaving the block rolls back the commands run so far
+                    if useTransaction and isinstance(error, sqlite3.Error):
+                        raise
+
+                latencies.append(time.perf_counter() - began)
+    except sqlite3.Error:
+        print("transaction rolled back, nothing was committed", file=sys.stderr)
+
+    seconds: float = time.perf_counter() - start
+
+    if showStats:
+        latencies.sort()
+        print(
+            f"{len(latencies)} commands in {seconds:.3f}s, "
+            f"{len(latencies) / seconds if seconds else 0.0:.0f} commands/s, "
+            f"p50 {percentile(latencies, 50) * 1000:.3f}ms, "
+            f"p99 {percentile(latencies, 99) * 1000:.3f}ms, "
+            f"{failed} failed",
+            file=sys.stderr,
+        )
+
+    return failed
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="Shell for the virtual file system. Interactive unless "
+        "commands are given with -c or -f."
+    )
+    parser.add_argument(
+        "-c",
+        dest="commands",
+        action="append",
+        metavar="CMD",
+        help="run CMD, may be given more than once",
+    )
+    parser.add_argument(
+        "-f", dest="script", metavar="SCRIPT", help="run the commands in SCRIPT, - for stdin"
+    )
+    parser.add_argument(
+        "--transaction",
+        action="store_true",
+        help="commit all commands of -c/-f together, at the end",
+    )
+    parser.add_argument(
+        "--reseed",
+        action="store_true",
+        help=f"reload the file system from {CSV_FILE}, discarding all changes",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="print commands per second and p50/p99 latency to stderr",
+    )
+    parser.add_argument(
+        "--slow-ms",
+        type=float,
+        metavar="MS",
+        help="turn on `perf' and log file system operations slower than MS to stderr",
+    )
+    args = parser.parse_args()
+
+    # Several shells may share the database
+    fileSystem.enable_concurrency()
+    fileSystem.set_db_path(DB_PATH)
+    fileSystem.set_table_name(TABLE_NAME)
+    # Changes persist between sessions, the CSV is only loaded again when
+    # it has changed or --reseed is given
+    fileSystem.seed_from_csv(CSV_FILE, force=args.reseed)
+
+    if args.slow_ms is not None:
+        perfStats.enable(args.slow_ms)
+
+    if args.commands is None and args.script is None:
+        interactive()
+    else:
+        script = sys.stdin if args.script == "-" else None
+
+        if args.script not in (None, "-"):
+            script = open(args.script)
+
+        # Script lines are read as they are run
+        failed: int = batch(
+            itertools.chain(args.commands or [], script or []),
+            args.transaction,
+            args.stats,
+        )
+
+        if script is not None:
+            script.close()
+        fileSystem.close()
+
+        sys.exit(1 if failed else 0)
@@ -0,0 +1,58 @@
+import os, sys
+import pytest
+
+ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+
+from cmd_pkg import fileSystem
+
+CSV_FILE: str = os.path.join(ROOT, "fileData.csv")
+
+
+@pytest.fixture
+def fs(tmp_path):
+    """
+    fileSystem on a fresh database in a temporary directory, loaded from
+    fileData.csv, with "/" as the current working directory.
+    """
+    fileSystem.set_db_path(str(tmp_path / "filesystem.sqlite"))
+    fileSystem.set_table_name("FileSystem")
+    fileSystem.csv_to_table(CSV_FILE)
+    fileSystem.set_cwd("/")
+
+    yield fileSystem
+
+    fileSystem.close()
+    fileSystem.clear_dentry_cache()
+
+
+def make_children(fs, parent: str, count: int) -> None:
+    """
+    Makes a directory with count empty files in it, inserted in one batch.
+    """
+    fs.make_dir(parent)
+    pid: int = fs.stats(parent).id
+
+    with fs.transaction() as conn:
+        conn.executemany(
+            'INSERT INTO "FileSystem" (pid, file_name, file_type, file_size) '
+            "VALUES (?, ?, 'file', 0)",
+            [(pid, f"f{i}") for i in range(count)],
+        )
+
+
+def refuse_inserts(fs, file_name: str) -> None:
+    """
+    Makes the database refuse to insert entries named file_name, so that
+    operations on them fail in sqlite.
+    """
+    fs._get_connection().execute(
+        f"""
+        CREATE TRIGGER "refuse_{file_name}" BEFORE INSERT ON "FileSystem"
+        WHEN NEW.file_name = '{file_name}'
+        BEGIN
+            SELECT RAISE(ABORT, 'refused');
+        END
+        """
+    )
@@ -0,0 +1,47 @@
+from ParseCommand import parseCommand
+from Pipeline import runPipeline
+
+
+def run(line: str) -> list[str]:
+    """
+    Returns the output lines of a command line.
+    """
+    return list(runPipeline(parseCommand(line), color=False))
+
+
+def test_wc_counts_bytes_as_stored(fs):
+    fs.write_file("/w.txt", "one two\nthree  four\nlast line no newline")
+
+    assert run("wc /w.txt") == ["      2       8      40 /w.txt"]
+    assert run("wc -c /w.txt") == ["     40 /w.txt"]
+    assert run("wc -l /w.txt") == ["      2 /w.txt"]
+
+
+def test_wc_counts_words_split_between_blocks(fs):
+    # 64KiB blocks end within a word
+    fs.write_file("/big.txt", "ab " * 30000 + "\n")
+
+    assert run("wc /big.txt") == ["      1   30000   90001 /big.txt"]
+
+
+def test_wc_counts_piped_lines_as_printed(fs):
+    fs.write_file("/w.txt", "a\n\nb\n")
+
+    assert run("cat /w.txt | wc") == ["      3       2       5"]
+    assert run("wc /nope") == ["wc: /nope: No such file or directory"]
+
+
+def test_head_and_tail_take_attached_count(fs):
+    fs.write_file("/n.txt", "".join(f"{i}\n" for i in range(1, 21)))
+
+    assert run("head -n5 /n.txt") == ["1", "2", "3", "4", "5"]
+    assert run("head -n 2 /n.txt") == ["1", "2"]
+    assert run("tail -n3 /n.txt") == ["18", "19", "20"]
+    assert run("cat /n.txt | tail -n2") == ["19", "20"]
+
+
+def test_only_commands_are_run(fs):
+    assert run("__dir__") == ["__dir__: command not found"]
+    assert run("__getattr__ x") == ["__getattr__: command not found"]
+    assert run("fileSystem") == ["fileSystem: command not found"]
+    assert run("pwd") == ["/"]
@@ -0,0 +1,103 @@
+import threading
+import pytest
+
+
+class Rollback(Exception):
+    pass
+
+
+def hold_transaction(
+    fs, work, rollback: bool
+) -> tuple[threading.Event, threading.Thread]:
+    """
+    Runs work in a transaction on another thread and returns once it is
+    done, with the transaction still open. Setting the returned event
+    commits it, or rolls it back if rollback is True.
+    """
+    ready: threading.Event = threading.Event()
+    finish: threading.Event = threading.Event()
+
+    def run() -> None:
+        try:
+            with fs.transaction():
+                work()
+                ready.set()
+                finish.wait(5)
+
+                if rollback:
+                    raise Rollback()
+        except Rollback:
+            pass
+
+    thread: threading.Thread = threading.Thread(target=run)
+    thread.start()
+    assert ready.wait(5)
+
+    return finish, thread
+
+
+def make_and_look_up(fs, path: str) -> None:
+    fs.make_dir(path)
+    assert fs.path_exists(path)
+
+
+def test_rolled_back_path_is_not_served_to_other_threads(fs):
+    finish, thread = hold_transaction(
+        fs, lambda: make_and_look_up(fs, "/uncommitted"), rollback=True
+    )
+
+    assert not fs.path_exists("/uncommitted")
+
+    finish.set()
+    thread.join()
+
+    assert not fs.path_exists("/uncommitted")
+    with pytest.raises(FileNotFoundError):
+        fs.make_dir("/uncommitted/child")
+
+
+def test_committed_path_replaces_what_other_threads_cached(fs):
+    finish, thread = hold_transaction(
+        fs, lambda: make_and_look_up(fs, "/committed"), rollback=False
+    )
+
+    # Cached as missing while the transaction is open
+    assert not fs.path_exists("/committed")
+
+    finish.set()
+    thread.join()
+
+    assert fs.path_exists("/committed")
+    fs.make_dir("/committed/child")
+    assert fs.is_dir("/committed/child")
+
+
+def test_transaction_sees_its_own_changes(fs):
+    assert fs.path_exists("/home")
+
+    with pytest.raises(Rollback):
+        with fs.transaction():
+            fs.remove_tree("/home")
+            fs.make_dir("/new")
+
+            assert not fs.path_exists("/home")
+            assert fs.exists_many(["/home", "/new"]) == [False, True]
+
+            raise Rollback()
+
+    assert fs.exists_many(["/home", "/new"]) == [True, False]
+
+
+def test_rolled_back_savepoint_is_forgotten(fs):
+    with fs.transaction():
+        with pytest.raises(Rollback):
+            with fs.transaction():
+                fs.make_dir("/inner")
+                assert fs.path_exists("/inner")
+
+                raise Rollback()
+
+        assert not fs.path_exists("/inner")
+        fs.make_dir("/outer")
+
+    assert fs.exists_many(["/inner", "/outer"]) == [False, True]
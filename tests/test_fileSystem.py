@@ -0,0 +1,57 @@
+import json
+from conftest import make_children
+
+
+def query_plan(fs, statement: str, params: tuple) -> list[str]:
+    """
+    Returns the details of the EXPLAIN QUERY PLAN rows of statement.
+    """
+    conn = fs._get_connection()
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}", params)]
+
+
+def test_resolve_seeks_each_component(fs):
+    plan: list[str] = query_plan(fs, fs._sql().resolve, (json.dumps(["big", "f1"]),))
+
+    assert any("(pid=? AND file_name=?)" in detail for detail in plan), plan
+
+
+def test_resolve_in_large_directory(fs):
+    make_children(fs, "/big", 5000)
+    fs.clear_dentry_cache()
+
+    assert fs.path_exists("/big/f4999")
+    assert fs.stats("/big/f4999").file_name == "f4999"
+    assert not fs.path_exists("/big/f5000")
+    assert not fs.path_exists("/big/f1/x")
+
+
+def test_batch_lookups_seek_each_component(fs):
+    for statement in (fs._sql().resolve_many, fs._sql().stats_many):
+        plan: list[str] = query_plan(fs, statement, ("[]",))
+
+        assert any("(pid=? AND file_name=?)" in detail for detail in plan), plan
+
+
+def test_batch_lookups_match_single_lookups(fs):
+    make_children(fs, "/big", 5000)
+    paths: list[str] = [f"/big/f{i}" for i in range(0, 5000, 7)] + [
+        "/big",
+        "/big/f5000",
+        "/big/f1/x",
+        "/home",
+        "/nope",
+        "/",
+    ]
+    fs.clear_dentry_cache()
+
+    entries: list = fs.stats_many(paths)
+    exists: list[bool] = fs.exists_many(paths)
+
+    for path, entry, found in zip(paths, entries, exists):
+        assert found == fs.path_exists(path)
+
+        if found:
+            assert dict(entry) == dict(fs.stats(path))
+        else:
+            assert isinstance(entry, FileNotFoundError)
@@ -0,0 +1,11 @@
+from benchmarks.import_budget import fastest_import_times
+
+# Milliseconds `import main' may take, as in benchmarks/import_budget.py
+BUDGET_MS: float = 50.0
+
+
+def test_import_main_within_budget():
+    times: dict[str, tuple[int, int]] = fastest_import_times(runs=5)
+    total_ms: float = times["main"][1] / 1000
+
+    assert total_ms <= BUDGET_MS, f"import main took {total_ms:.2f}ms"
@@ -0,0 +1,34 @@
+import pytest
+from conftest import CSV_FILE
+from cmd_pkg import perfStats
+
+
+@pytest.fixture
+def perf(fs):
+    perfStats.reset()
+    perfStats.enable()
+
+    yield perfStats
+
+    perfStats.disable()
+    perfStats.reset()
+
+
+def test_csv_to_table_counts_blob_bytes(fs, perf):
+    fs.csv_to_table(CSV_FILE)
+
+    logical_bytes: int = fs.dedup_report()["logical_bytes"]
+
+    assert logical_bytes > 0
+    assert perf.totals()["csv_to_table"].blob_bytes == logical_bytes
+
+
+def test_only_database_functions_are_operations(fs, perf):
+    fs.path_split("/home/a")
+    fs.abs_path("home")
+    fs.get_cwd()
+    fs.write_file("/a.txt", "abc")
+    fs.read_file("/a.txt")
+
+    assert set(perf.totals()) == {"write_file", "read_file"}
+    assert perf.totals()["write_file"].blob_bytes == 3
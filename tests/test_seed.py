@@ -0,0 +1,64 @@
+import os, shutil, sqlite3
+from conftest import CSV_FILE
+
+
+def use_db(fs, path) -> None:
+    fs.set_db_path(str(path))
+    fs.clear_dentry_cache()
+
+
+def test_seed_loads_missing_table_once(fs, tmp_path):
+    use_db(fs, tmp_path / "new.sqlite")
+
+    assert fs.seed_from_csv(CSV_FILE)
+    assert fs.path_exists("/home")
+
+    fs.make_dir("/mine")
+
+    assert not fs.seed_from_csv(CSV_FILE)
+    assert fs.path_exists("/mine")
+
+
+def test_seed_keeps_table_without_fingerprint(fs, tmp_path):
+    # As written before the content store and fingerprints existed
+    db: str = str(tmp_path / "old.sqlite")
+    conn: sqlite3.Connection = sqlite3.connect(db)
+    conn.execute(
+        'CREATE TABLE "FileSystem" (id INTEGER PRIMARY KEY, pid INTEGER, '
+        "file_name TEXT, file_type TEXT, file_size REAL, owner_name TEXT, "
+        "group_name TEXT, permissions TEXT, modification_time TEXT, content BLOB)"
+    )
+    conn.execute(
+        """INSERT INTO "FileSystem" VALUES (1, 0, 'mine', 'file', 5, 'user', 'user',
+        '-rw-r--r--', '2020-01-01 00:00:00', 'hello')"""
+    )
+    conn.commit()
+    conn.close()
+    use_db(fs, db)
+
+    assert not fs.seed_from_csv(CSV_FILE)
+    assert fs.read_file("/mine") == b"hello"
+    assert not fs.path_exists("/home")
+
+    assert fs.seed_from_csv(CSV_FILE, force=True)
+    assert not fs.path_exists("/mine")
+
+
+def test_seed_reloads_changed_csv(fs, tmp_path):
+    csv_file: str = str(tmp_path / "fileData.csv")
+    shutil.copy(CSV_FILE, csv_file)
+    use_db(fs, tmp_path / "new.sqlite")
+
+    assert fs.seed_from_csv(csv_file)
+    fs.make_dir("/mine")
+
+    # Touched but not changed
+    os.utime(csv_file, ns=(0, 0))
+    assert not fs.seed_from_csv(csv_file)
+    assert fs.path_exists("/mine")
+
+    with open(csv_file, "a") as file:
+        file.write("\n999,0,added,directory,0,user,user,drwxr-xr-x,2020-01-01,")
+
+    assert fs.seed_from_csv(csv_file)
+    assert fs.exists_many(["/mine", "/added"]) == [False, True]
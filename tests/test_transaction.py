@@ -0,0 +1,45 @@
+import sqlite3
+import pytest
+import main
+from conftest import refuse_inserts
+
+
+def test_operation_error_rolls_back_transaction(fs):
+    refuse_inserts(fs, "bad")
+
+    with pytest.raises(sqlite3.Error):
+        with fs.transaction():
+            fs.make_dir("/a")
+            fs.touch("/a/file")
+            fs.make_dir("/bad")
+
+    assert not fs.path_exists("/a")
+    assert not fs.path_exists("/bad")
+
+
+def test_operation_error_outside_transaction_is_printed(fs, capsys):
+    refuse_inserts(fs, "bad")
+
+    fs.make_dir("/a")
+    fs.make_dir("/bad")
+
+    assert "refused" in capsys.readouterr().out
+    assert fs.path_exists("/a")
+    assert not fs.path_exists("/bad")
+
+
+def test_batch_transaction_is_all_or_nothing(fs):
+    refuse_inserts(fs, "bad")
+
+    failed: int = main.batch(["mkdir /a", "mkdir /bad", "mkdir /c"], True, False)
+
+    assert failed == 1
+    assert fs.exists_many(["/a", "/bad", "/c"]) == [False, False, False]
+
+
+def test_batch_without_transaction_keeps_going(fs):
+    refuse_inserts(fs, "bad")
+
+    main.batch(["mkdir /a", "mkdir /bad", "mkdir /c"], False, False)
+
+    assert fs.exists_many(["/a", "/bad", "/c"]) == [True, False, True]